@@ -1,64 +1,88 @@
 """
 Performance and Rate Limiting Configuration
 """
+import functools
 import os
-from typing import Dict, Any
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Tuple
 
+# Read-only mapping so handlers can't mutate shared limits at runtime
+_RATE_LIMITS: Mapping[str, Dict[str, Any]] = MappingProxyType({
+    "query": {
+        "limit": int(os.getenv("QUERY_RATE_LIMIT", "10")),
+        "window": int(os.getenv("QUERY_RATE_WINDOW", "60"))  # seconds
+    },
+    "ingest": {
+        "limit": int(os.getenv("INGEST_RATE_LIMIT", "5")),
+        "window": int(os.getenv("INGEST_RATE_WINDOW", "300"))
+    },
+    "health": {
+        "limit": int(os.getenv("HEALTH_RATE_LIMIT", "60")),
+        "window": int(os.getenv("HEALTH_RATE_WINDOW", "60"))
+    },
+    "default": {
+        "limit": int(os.getenv("DEFAULT_RATE_LIMIT", "100")),
+        "window": int(os.getenv("DEFAULT_RATE_WINDOW", "60"))
+    }
+})
+
+_CORS_ORIGINS: Tuple[str, ...] = tuple(
+    origin.strip() for origin in os.getenv(
+        "CORS_ORIGINS",
+        "http://localhost:5173,http://localhost:3000,http://frontend:3000"
+    ).split(",") if origin.strip()
+)
+
+
+# eq=False keeps identity-based hashing so the lru_cache'd method below works
+@dataclass(frozen=True, slots=True, eq=False)
 class PerformanceConfig:
-    """Configuration for performance optimizations"""
-    
+    """Configuration for performance optimizations
+
+    Env vars are read once at import time; the frozen, slotted singleton below
+    gives cheap attribute access on hot paths and guards against mutation.
+    """
+
     # Rate Limiting
-    REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379")
-    ENABLE_RATE_LIMITING = os.getenv("ENABLE_RATE_LIMITING", "true").lower() == "true"
-    
+    REDIS_URL: str = os.getenv("REDIS_URL", "redis://localhost:6379")
+    ENABLE_RATE_LIMITING: bool = os.getenv("ENABLE_RATE_LIMITING", "true").lower() == "true"
+
     # Request Timeouts
-    DEFAULT_TIMEOUT = float(os.getenv("DEFAULT_TIMEOUT", "30.0"))
-    QUERY_TIMEOUT = float(os.getenv("QUERY_TIMEOUT", "25.0"))
-    INGEST_TIMEOUT = float(os.getenv("INGEST_TIMEOUT", "60.0"))
-    
+    DEFAULT_TIMEOUT: float = float(os.getenv("DEFAULT_TIMEOUT", "30.0"))
+    QUERY_TIMEOUT: float = float(os.getenv("QUERY_TIMEOUT", "25.0"))
+    INGEST_TIMEOUT: float = float(os.getenv("INGEST_TIMEOUT", "60.0"))
+
     # Concurrency Limits
-    MAX_CONCURRENT_REQUESTS = int(os.getenv("MAX_CONCURRENT_REQUESTS", "20"))
-    MAX_QUERY_CONCURRENT = int(os.getenv("MAX_QUERY_CONCURRENT", "5"))
-    MAX_INGEST_CONCURRENT = int(os.getenv("MAX_INGEST_CONCURRENT", "3"))
-    
+    MAX_CONCURRENT_REQUESTS: int = int(os.getenv("MAX_CONCURRENT_REQUESTS", "20"))
+    MAX_QUERY_CONCURRENT: int = int(os.getenv("MAX_QUERY_CONCURRENT", "5"))
+    MAX_INGEST_CONCURRENT: int = int(os.getenv("MAX_INGEST_CONCURRENT", "3"))
+
     # Thread Pool
-    THREAD_POOL_SIZE = int(os.getenv("THREAD_POOL_SIZE", "4"))
-    
+    THREAD_POOL_SIZE: int = int(os.getenv("THREAD_POOL_SIZE", "4"))
+
     # Cache Settings
-    CACHE_TTL = int(os.getenv("CACHE_TTL", "300"))  # 5 minutes
-    ENABLE_CACHING = os.getenv("ENABLE_CACHING", "true").lower() == "true"
-    
+    CACHE_TTL: int = int(os.getenv("CACHE_TTL", "300"))  # 5 minutes
+    ENABLE_CACHING: bool = os.getenv("ENABLE_CACHING", "true").lower() == "true"
+
     # Rate Limits (requests per time window)
-    RATE_LIMITS: Dict[str, Dict[str, Any]] = {
-        "query": {
-            "limit": int(os.getenv("QUERY_RATE_LIMIT", "10")),
-            "window": int(os.getenv("QUERY_RATE_WINDOW", "60"))  # seconds
-        },
-        "ingest": {
-            "limit": int(os.getenv("INGEST_RATE_LIMIT", "5")),
-            "window": int(os.getenv("INGEST_RATE_WINDOW", "300"))
-        },
-        "health": {
-            "limit": int(os.getenv("HEALTH_RATE_LIMIT", "60")),
-            "window": int(os.getenv("HEALTH_RATE_WINDOW", "60"))
-        },
-        "default": {
-            "limit": int(os.getenv("DEFAULT_RATE_LIMIT", "100")),
-            "window": int(os.getenv("DEFAULT_RATE_WINDOW", "60"))
-        }
-    }
-    
+    RATE_LIMITS: Mapping[str, Dict[str, Any]] = field(default_factory=lambda: _RATE_LIMITS)
+
+    # CORS (comma-separated list of allowed origins)
+    CORS_ORIGINS: Tuple[str, ...] = _CORS_ORIGINS
+
     # Performance Monitoring
-    ENABLE_PERFORMANCE_LOGGING = os.getenv("ENABLE_PERFORMANCE_LOGGING", "true").lower() == "true"
-    SLOW_REQUEST_THRESHOLD = float(os.getenv("SLOW_REQUEST_THRESHOLD", "1.0"))  # seconds
-    
+    ENABLE_PERFORMANCE_LOGGING: bool = os.getenv("ENABLE_PERFORMANCE_LOGGING", "true").lower() == "true"
+    SLOW_REQUEST_THRESHOLD: float = float(os.getenv("SLOW_REQUEST_THRESHOLD", "1.0"))  # seconds
+
     # GZIP Compression
-    GZIP_MINIMUM_SIZE = int(os.getenv("GZIP_MINIMUM_SIZE", "1000"))  # bytes
-    
-    @classmethod
-    def get_rate_limit(cls, endpoint: str) -> Dict[str, int]:
-        """Get rate limit configuration for specific endpoint"""
-        return cls.RATE_LIMITS.get(endpoint, cls.RATE_LIMITS["default"])
+    GZIP_MINIMUM_SIZE: int = int(os.getenv("GZIP_MINIMUM_SIZE", "1500"))  # bytes
+    GZIP_LEVEL: int = int(os.getenv("GZIP_LEVEL", "1"))  # low level: most of the ratio, fraction of the CPU
+
+    @functools.lru_cache(maxsize=None)
+    def get_rate_limit(self, endpoint: str) -> Dict[str, int]:
+        """Get rate limit configuration for specific endpoint (memoized — called per request)"""
+        return self.RATE_LIMITS.get(endpoint, self.RATE_LIMITS["default"])
 
 # Create global config instance
 config = PerformanceConfig()
@@ -1,17 +1,29 @@
-from sqlalchemy import Column, Integer, String, LargeBinary
+from sqlalchemy import Boolean, Column, Integer, String, LargeBinary, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import Mapped, mapped_column
 from sqlalchemy.types import JSON
+from pgvector.sqlalchemy import Vector
 import uuid
 
 Base = declarative_base()
 
+# Embedding dimension for sentence-transformers/all-MiniLM-L6-v2
+EMBEDDING_DIM = 384
+
 class Document(Base):
     __tablename__ = "documents"
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     filename: Mapped[str] = mapped_column(String, nullable=False)
-    content: Mapped[str] = mapped_column(String, nullable=True)
-    embedding: Mapped[list] = mapped_column(JSON, nullable=True)
     num_chunks: Mapped[int] = mapped_column(Integer, nullable=False, default=1)
-    vector_ids: Mapped[list] = mapped_column(JSON, nullable=False)
+    selected: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False, server_default="false")
+
+class Chunk(Base):
+    __tablename__ = "chunks"
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    doc_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("documents.id"), nullable=False)
+    idx: Mapped[int] = mapped_column(Integer, nullable=False)
+    content: Mapped[str] = mapped_column(String, nullable=False)
+    embedding = mapped_column(Vector(EMBEDDING_DIM), nullable=True)
+
+    __table_args__ = (Index("ix_chunks_doc_id_idx", "doc_id", "idx"),)
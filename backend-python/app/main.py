@@ -1,9 +1,21 @@
 
 import asyncio
 import logging
-from datetime import datetime
+import time
+
+# Install uvloop before any event loop is created — libuv's C loop roughly
+# doubles throughput for I/O-bound ASGI workloads. Optional, like slowapi
+try:
+    import uvloop
+    uvloop.install()
+except ImportError:
+    uvloop = None
+
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, Request
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import text
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
@@ -15,7 +27,9 @@ from app.routes.health import router as health_router
 from app.db.models import Base
 from app.db.session import engine
 from app.middleware.performance import PerformanceMiddleware, AsyncLimitMiddleware
-from app.middleware.rate_limiting import redis_limiter
+from app.middleware.rate_limiting import redis_limiter, limiter as slowapi_limiter
+from app.middleware.compression import use_accelerated_gzip
+from app.config.performance import config as performance_config
 from app.services.cache_service import cache_service
 
 # Configure logging
@@ -27,10 +41,25 @@ async def lifespan(app: FastAPI):
     """Application lifespan events"""
     # Startup
     logger.info("🚀 Starting FastAPI Document-RAG Backend")
-    
+
+    # Size the default executor used by asyncio.to_thread for CPU-bound work
+    loop = asyncio.get_running_loop()
+    loop.set_default_executor(ThreadPoolExecutor(max_workers=performance_config.THREAD_POOL_SIZE))
+
     # Initialize database
     async with engine.begin() as conn:
+        if engine.dialect.name == "postgresql":
+            await conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
         await conn.run_sync(Base.metadata.create_all)
+        if engine.dialect.name == "postgresql":
+            # HNSW index so similarity search is an indexed pushdown instead
+            # of a full scan; m/ef_construction are the pgvector-recommended
+            # balance of recall vs build time for collections this size
+            await conn.execute(text(
+                "CREATE INDEX IF NOT EXISTS ix_chunks_embedding "
+                "ON chunks USING hnsw (embedding vector_cosine_ops) "
+                "WITH (m = 16, ef_construction = 64)"
+            ))
     logger.info("✅ Database tables initialized")
     
     # Initialize Redis rate limiter
@@ -53,52 +82,62 @@ app = FastAPI(
     title="Document-RAG API",
     description="FastAPI backend for document ingestion and RAG queries",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # Security and Performance Middleware
 app.add_middleware(TrustedHostMiddleware, allowed_hosts=["*"])  # Configure properly in production
-app.add_middleware(GZipMiddleware, minimum_size=1000)
+use_accelerated_gzip()  # swap in ISA-L gzip when installed
+app.add_middleware(
+    GZipMiddleware,
+    minimum_size=performance_config.GZIP_MINIMUM_SIZE,
+    compresslevel=performance_config.GZIP_LEVEL
+)
 app.add_middleware(AsyncLimitMiddleware, max_concurrent=20)
 app.add_middleware(PerformanceMiddleware, max_request_time=30.0)
 
-# Add CORS middleware
+# Add CORS middleware. Explicit methods/headers skip starlette's wildcard
+# handling, and max_age lets browsers cache preflights for 24h
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=[
-        "http://localhost:5173",  # Vite dev server
-        "http://localhost:3000",  # Docker frontend
-        "http://frontend:3000"    # Docker internal network
-    ],
+    allow_origins=performance_config.CORS_ORIGINS,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"]
+    allow_methods=["GET", "POST", "OPTIONS"],
+    allow_headers=["content-type", "authorization"],
+    max_age=86400
 )
 
-# Rate limiting error handler
-try:
-    from slowapi import Limiter, _rate_limit_exceeded_handler
-    from slowapi.util import get_remote_address
+# Rate limiting error handler — reuse the limiter built in rate_limiting.py
+# instead of constructing a second one here
+if slowapi_limiter is not None:
+    from slowapi import _rate_limit_exceeded_handler
     from slowapi.errors import RateLimitExceeded
-    
-    limiter = Limiter(key_func=get_remote_address)
-    app.state.limiter = limiter
+
+    app.state.limiter = slowapi_limiter
     app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
     logger.info("✅ SlowAPI rate limiting enabled")
-except ImportError:
+else:
     logger.warning("⚠️ SlowAPI not available. Using custom rate limiting implementation.")
     # Set a dummy limiter for the app state
     app.state.limiter = None
 
+# Sanity check: the performance middleware stack must actually be installed
+assert any(m.cls is PerformanceMiddleware for m in app.user_middleware)
+assert any(m.cls is AsyncLimitMiddleware for m in app.user_middleware)
+
+# Precomputed response template: the health endpoint is polled constantly and
+# should not pay for datetime construction or per-request dict serialization
+_HEALTH_TEMPLATE = (
+    b'{"status":"healthy","message":"FastAPI Document-RAG Backend is running",'
+    b'"timestamp":"%s","version":"1.0.0"}'
+)
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint to verify the service is running"""
-    return {
-        "status": "healthy",
-        "message": "FastAPI Document-RAG Backend is running",
-        "timestamp": datetime.utcnow().isoformat() + "Z",
-        "version": "1.0.0"
-    }
+    timestamp = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()).encode()
+    return Response(_HEALTH_TEMPLATE % timestamp, media_type="application/json")
 
 app.include_router(ingest_router)
 app.include_router(query_router)
@@ -0,0 +1,39 @@
+"""
+Faster gzip backend for the compression middleware
+"""
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Try to import the ISA-L bindings, but make them optional
+try:
+    from isal import isal_zlib
+    ISAL_AVAILABLE = True
+except ImportError:
+    ISAL_AVAILABLE = False
+
+
+def use_accelerated_gzip() -> bool:
+    """Point starlette's GZip middleware at ISA-L's zlib when available
+
+    python-isal is a drop-in zlib replacement backed by SIMD-accelerated
+    ISA-L, roughly 2-3x faster than stdlib zlib at the same level. Swapping
+    the module reference keeps starlette's middleware logic untouched.
+    """
+    if not ISAL_AVAILABLE:
+        logger.info("isal not available. Using stdlib zlib for GZip responses.")
+        return False
+
+    try:
+        import starlette.middleware.gzip as gzip_middleware
+
+        if hasattr(gzip_middleware, "zlib"):
+            gzip_middleware.zlib = isal_zlib
+            logger.info("✅ Using ISA-L accelerated gzip for response compression")
+            return True
+
+        logger.warning("⚠️ Unexpected starlette gzip internals. Using stdlib zlib.")
+        return False
+    except Exception as e:
+        logger.warning(f"Failed to enable accelerated gzip: {e}")
+        return False
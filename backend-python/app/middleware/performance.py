@@ -1,12 +1,13 @@
 import time
 import asyncio
-from typing import Callable
-from fastapi import Request, Response
 from fastapi.responses import JSONResponse
+from app.config.performance import config as performance_config
 import logging
 
 logger = logging.getLogger(__name__)
 
+SLOW_REQUEST_THRESHOLD = performance_config.SLOW_REQUEST_THRESHOLD
+
 class PerformanceMiddleware:
     """Middleware for performance monitoring and optimization"""
     
@@ -20,25 +21,28 @@ class PerformanceMiddleware:
             return
         
         start_time = time.time()
-        request = Request(scope, receive)
-        
+        # Read path/method straight from the scope — constructing a Request
+        # just to log them parses headers and the URL for nothing
+        method = scope["method"]
+        path = scope["path"]
+
         async def send_wrapper(message):
             if message["type"] == "http.response.start":
                 process_time = time.time() - start_time
                 message["headers"].append([
-                    b"x-process-time", 
+                    b"x-process-time",
                     str(process_time).encode()
                 ])
-                
-                # Log slow requests
-                if process_time > 1.0:
+
+                # Log slow requests (lazy %-formatting: no string work unless emitted)
+                if process_time > SLOW_REQUEST_THRESHOLD:
                     logger.warning(
-                        f"Slow request: {request.method} {request.url.path} "
-                        f"took {process_time:.2f}s"
+                        "Slow request: %s %s took %.2fs",
+                        method, path, process_time
                     )
-            
+
             await send(message)
-        
+
         try:
             # Set timeout for requests
             await asyncio.wait_for(
@@ -46,7 +50,7 @@ class PerformanceMiddleware:
                 timeout=self.max_request_time
             )
         except asyncio.TimeoutError:
-            logger.error(f"Request timeout: {request.method} {request.url.path}")
+            logger.error("Request timeout: %s %s", method, path)
             response = JSONResponse(
                 status_code=408,
                 content={"detail": "Request timeout"}
@@ -60,40 +64,47 @@ class AsyncLimitMiddleware:
     def __init__(self, app, max_concurrent: int = 10):
         self.app = app
         self.max_concurrent = max_concurrent
-        self.semaphores = {}
-    
+        # Fixed prefix -> semaphore mapping built once at startup. Keying by
+        # prefix instead of the full request path keeps memory bounded and
+        # makes the limit apply across all paths under an endpoint
+        self.semaphores = {
+            "/query": asyncio.Semaphore(5),   # Lower limit for expensive query operations
+            "/ingest": asyncio.Semaphore(3),  # Even lower for file processing
+        }
+        self.prefixes = tuple(self.semaphores)
+        self.default_semaphore = asyncio.Semaphore(max_concurrent)
+
     def get_semaphore(self, path: str) -> asyncio.Semaphore:
-        """Get or create semaphore for endpoint"""
-        if path not in self.semaphores:
-            # Different limits for different endpoints
-            if path.startswith("/query"):
-                limit = 5  # Lower limit for expensive query operations
-            elif path.startswith("/ingest"):
-                limit = 3  # Even lower for file processing
-            else:
-                limit = self.max_concurrent
-            
-            self.semaphores[path] = asyncio.Semaphore(limit)
-        
-        return self.semaphores[path]
-    
+        """Get semaphore for endpoint"""
+        for prefix in self.prefixes:
+            if path.startswith(prefix):
+                return self.semaphores[prefix]
+        return self.default_semaphore
+
     async def __call__(self, scope, receive, send):
         if scope["type"] != "http":
             await self.app(scope, receive, send)
             return
-        
-        request = Request(scope, receive)
-        path = request.url.path
+
+        path = scope["path"]
         semaphore = self.get_semaphore(path)
-        
+
+        # Shed load without waiting: locked() followed immediately by acquire()
+        # has no await in between, so no other request can take the last permit
+        # before we do, and acquire() returns without yielding. The old
+        # `async with` after the check could block in the acquire and hold the
+        # request instead of rejecting it
         if semaphore.locked():
-            logger.warning(f"Rate limiting {path} - too many concurrent requests")
+            logger.warning("Rate limiting %s - too many concurrent requests", path)
             response = JSONResponse(
                 status_code=429,
                 content={"detail": "Too many concurrent requests"}
             )
             await response(scope, receive, send)
             return
-        
-        async with semaphore:
+
+        await semaphore.acquire()
+        try:
             await self.app(scope, receive, send)
+        finally:
+            semaphore.release()
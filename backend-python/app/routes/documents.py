@@ -1,6 +1,7 @@
 
 import logging
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
+from sqlalchemy import select
 from app.db.session import async_session
 from app.db.models import Document
 
@@ -9,18 +10,18 @@ logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/documents")
 
 @router.get("")
-async def list_documents():
+async def list_documents(limit: int = Query(100, ge=1, le=1000), offset: int = Query(0, ge=0)):
     try:
         async with async_session() as session:
-            result = await session.execute(
-                Document.__table__.select()
+            # Stream rows instead of materializing the whole table with
+            # fetchall(); pagination keeps the response bounded
+            result = await session.stream(
+                select(Document.id, Document.filename).limit(limit).offset(offset)
             )
-            docs = result.fetchall()
-            return {
-                "documents": [
-                    {"id": str(doc.id), "filename": doc.filename} for doc in docs
-                ]
-            }
+            documents = []
+            async for doc_id, filename in result:
+                documents.append({"id": str(doc_id), "filename": filename})
+            return {"documents": documents}
     except Exception as e:
         logger.error(f"List documents failed: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
@@ -1,5 +1,6 @@
 from fastapi import APIRouter
 from app.services.cache_service import cache_service
+from app.utils.cached_embeddings import get_embed_cache_stats
 
 router = APIRouter()
 
@@ -12,7 +13,7 @@ async def health_check():
 async def get_cache_stats():
     """Get Redis cache statistics"""
     stats = await cache_service.get_cache_stats()
-    return {"cache_stats": stats}
+    return {"cache_stats": stats, "embedding_cache": get_embed_cache_stats()}
 
 @router.post("/cache/clear")
 async def clear_cache():
@@ -11,10 +11,13 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/ingest", tags=["Ingest"])
 
+# Hoisted once — no dict lookups per request
+_INGEST_LIMIT = RATE_LIMITS["ingest"]["limit"]
+_INGEST_WINDOW = RATE_LIMITS["ingest"]["window"]
+
 async def ingest_rate_limit(request: Request):
     """Rate limiting dependency for ingest endpoints"""
-    limits = RATE_LIMITS["ingest"]
-    await rate_limit_check(request, limits["limit"], limits["window"])
+    await rate_limit_check(request, _INGEST_LIMIT, _INGEST_WINDOW)
 
 @router.post("", response_model=IngestResponse, dependencies=[Depends(ingest_rate_limit)])
 @async_timeout(60.0)  # 60 second timeout for file processing
@@ -22,10 +25,10 @@ async def ingest_rate_limit(request: Request):
 async def ingest(file: UploadFile = File(...), request: Request = None):
     """Ingest document with rate limiting and optimization"""
     try:
-        logger.info(f"Processing file upload from {request.client.host}: {file.filename}")
+        logger.info("Processing file upload from %s: %s", request.client.host, file.filename)
         result = await ingest_document(file)
-        logger.info(f"File ingestion completed: {file.filename}")
+        logger.info("File ingestion completed: %s", file.filename)
         return result
     except Exception as e:
-        logger.error(f"Ingest failed for {file.filename}: {e}")
+        logger.error("Ingest failed for %s: %s", file.filename, e)
         raise HTTPException(status_code=500, detail="Internal server error")
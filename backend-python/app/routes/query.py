@@ -11,10 +11,13 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/query", tags=["Query"])
 
+# Hoisted once — no dict lookups per request
+_QUERY_LIMIT = RATE_LIMITS["query"]["limit"]
+_QUERY_WINDOW = RATE_LIMITS["query"]["window"]
+
 async def query_rate_limit(request: Request):
     """Rate limiting dependency for query endpoints"""
-    limits = RATE_LIMITS["query"]
-    await rate_limit_check(request, limits["limit"], limits["window"])
+    await rate_limit_check(request, _QUERY_LIMIT, _QUERY_WINDOW)
 
 @router.post("", response_model=QueryResponse, dependencies=[Depends(query_rate_limit)])
 @async_timeout(25.0)  # 25 second timeout
@@ -22,10 +25,14 @@ async def query_rate_limit(request: Request):
 async def query(payload: QueryRequest, request: Request):
     """Query documents using RAG with rate limiting and optimization"""
     try:
-        logger.info(f"Processing query from {request.client.host}: {payload.question[:100]}...")
-        result = await query_documents(payload.model_dump())
-        logger.info(f"Query completed successfully")
+        logger.info("Processing query from %s: %.100s...", request.client.host, payload.question)
+        result = await query_documents(payload)
+        if "error" in result:
+            raise HTTPException(status_code=400, detail=result["error"])
+        logger.info("Query completed successfully")
         return result
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Query failed: {e}")
+        logger.error("Query failed: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error")
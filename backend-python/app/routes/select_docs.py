@@ -12,7 +12,7 @@ router = APIRouter(prefix="/select-docs")
 @router.post("", response_model=SelectDocsResponse)
 async def select_docs(payload: SelectDocsRequest):
     try:
-        return await select_documents(payload.dict())
+        return await select_documents(payload)
     except Exception as e:
         logger.error(f"Select docs failed: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
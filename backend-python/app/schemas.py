@@ -1,9 +1,15 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from typing import Optional
 
 class QueryRequest(BaseModel):
+    # Strip stray whitespace in Rust-side validation (a padded question
+    # would otherwise dodge every cache tier) and drop unknown fields
+    # instead of carrying them through validation
+    model_config = ConfigDict(str_strip_whitespace=True, extra="ignore")
+
     question: str
     doc_id: Optional[str] = None
+    no_cache: bool = False
 
 class QueryResponse(BaseModel):
     answer: str
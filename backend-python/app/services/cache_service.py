@@ -1,28 +1,128 @@
 """
 Redis caching service for embeddings and query results
 """
-import json
 import hashlib
 import logging
 from typing import Optional, Any, List
+import numpy as np
+import orjson
 import redis.asyncio as redis
 import os
 from datetime import timedelta
 
 logger = logging.getLogger(__name__)
 
+# Optional zstd compression for large text payloads (query results, chunk
+# bodies, parsed documents). Level 3 compresses natural-language text 3-5x at
+# ~1 GB/s, so network transfer and Redis RAM dominate the trade
+try:
+    import zstandard as zstd
+    _ZSTD_COMPRESSOR = zstd.ZstdCompressor(level=3)
+    _ZSTD_DECOMPRESSOR = zstd.ZstdDecompressor()
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+# Compressed values carry a magic prefix so uncompressed entries written by
+# older code (or without zstandard installed) still decode. Only used for
+# text/JSON payloads, whose first byte is never 0x01
+_ZSTD_MAGIC = b"\x01"
+_COMPRESS_MIN_SIZE = 1024
+
+def _maybe_compress(payload: bytes) -> bytes:
+    """Compress a text payload when zstd is available and it's worth it"""
+    if ZSTD_AVAILABLE and len(payload) >= _COMPRESS_MIN_SIZE:
+        return _ZSTD_MAGIC + _ZSTD_COMPRESSOR.compress(payload)
+    return payload
+
+def _maybe_decompress(payload: bytes) -> bytes:
+    """Inverse of _maybe_compress; uncompressed payloads pass through"""
+    if payload[:1] == _ZSTD_MAGIC:
+        return _ZSTD_DECOMPRESSOR.decompress(payload[1:])
+    return payload
+
+def _quantize_embedding(embedding: List[float]) -> bytes:
+    """Pack an embedding as [float32 scale][int8 values]
+
+    Int8 with a per-vector scale is 4x smaller than float32 and well within
+    MiniLM's noise floor (max error scale/254), cutting Redis memory and
+    network bytes for the hottest cache keys.
+    """
+    v = np.asarray(embedding, dtype=np.float32)
+    scale = float(np.max(np.abs(v))) if v.size else 0.0
+    if scale == 0.0:
+        scale = 1.0
+    q = np.round(v / scale * 127.0).astype(np.int8)
+    return np.float32(scale).tobytes() + q.tobytes()
+
+def _dequantize_embedding(payload: bytes) -> Optional[List[float]]:
+    """Inverse of _quantize_embedding
+
+    Entries written before the binary format (JSON arrays) are detected by
+    their leading byte and treated as misses rather than decoded as garbage.
+    """
+    if len(payload) <= 4 or payload[:1] in (b"[", b"{"):
+        return None
+    scale = np.frombuffer(payload, dtype=np.float32, count=1)[0]
+    q = np.frombuffer(payload, dtype=np.int8, offset=4)
+    return (q.astype(np.float32) * (scale / 127.0)).tolist()
+
 class CacheService:
     """Redis-based caching service for embeddings and query results"""
-    
+
+    # Cursor-based SCAN+UNLINK executed server-side in one round-trip. Unlike
+    # KEYS this never blocks Redis on a large keyspace, no key list is
+    # materialized on the client, and UNLINK frees values off-thread
+    SCAN_DELETE_SCRIPT = """
+    local cursor = "0"
+    local deleted = 0
+    repeat
+        local result = redis.call('SCAN', cursor, 'MATCH', ARGV[1], 'COUNT', 500)
+        cursor = result[1]
+        for _, key in ipairs(result[2]) do
+            redis.call('UNLINK', key)
+            deleted = deleted + 1
+        end
+    until cursor == "0"
+    return deleted
+    """
+
     def __init__(self):
         self.redis_client: Optional[redis.Redis] = None
         self.redis_url = os.getenv("REDIS_URL", "redis://localhost:6379/0")
         self.default_ttl = int(os.getenv("REDIS_TTL", "3600"))  # 1 hour default
-        
+
+    @property
+    def enabled(self) -> bool:
+        """Whether Redis is connected; callers can skip cache work when False
+
+        When Redis is down or disabled, every get/set short-circuits before
+        any key hashing, so the degraded path is essentially free.
+        """
+        return self.redis_client is not None
+
+
     async def connect(self):
         """Initialize Redis connection"""
         try:
-            self.redis_client = redis.from_url(self.redis_url, decode_responses=True)
+            # Explicit pool so concurrent tasks don't serialize through one
+            # socket; hiredis (pulled in by redis[hiredis]) gives C-speed reply
+            # parsing for the binary embedding payloads.
+            # BlockingConnectionPool queues callers when all connections are
+            # checked out instead of raising, so bursts degrade to waiting
+            # rather than errors; keepalive + socket timeout bound tail
+            # latency on dead peers.
+            # Binary client (decode_responses=False): embeddings are stored as
+            # raw int8 bytes, and orjson handles bytes for the rest
+            pool = redis.BlockingConnectionPool.from_url(
+                self.redis_url,
+                max_connections=64,
+                decode_responses=False,
+                socket_keepalive=True,
+                socket_timeout=2,
+                health_check_interval=30,
+            )
+            self.redis_client = redis.Redis(connection_pool=pool)
             # Test connection
             await self.redis_client.ping()
             logger.info("✅ Connected to Redis for caching")
@@ -43,13 +143,15 @@ class CacheService:
         key_parts.extend([f"{k}={v}" for k, v in sorted(kwargs.items())])
         key_string = "|".join(key_parts)
         
-        # Create hash for consistent key length
-        key_hash = hashlib.sha256(key_string.encode()).hexdigest()[:16]
+        # Create hash for consistent key length. blake2b with an 8-byte digest
+        # is much cheaper than SHA-256 on 1KB chunks and this key only needs
+        # collision resistance against the Redis keyspace, not an attacker
+        key_hash = hashlib.blake2b(key_string.encode(), digest_size=8).hexdigest()
         return f"{prefix}:{key_hash}"
     
     async def get_embedding_cache(self, text: str, model_name: str) -> Optional[List[float]]:
         """Get cached embedding for text"""
-        if not self.redis_client:
+        if not self.enabled:
             return None
             
         try:
@@ -58,7 +160,7 @@ class CacheService:
             
             if cached_result:
                 logger.info(f"📦 Cache HIT for embedding: {cache_key[:20]}...")
-                return json.loads(cached_result)
+                return _dequantize_embedding(cached_result)
             else:
                 logger.debug(f"📭 Cache MISS for embedding: {cache_key[:20]}...")
                 return None
@@ -69,17 +171,19 @@ class CacheService:
     
     async def set_embedding_cache(self, text: str, model_name: str, embedding: List[float], ttl: Optional[int] = None) -> bool:
         """Cache embedding for text"""
-        if not self.redis_client:
+        if not self.enabled:
             return False
             
         try:
             cache_key = self._generate_cache_key("embedding", text, model_name=model_name)
             cache_ttl = ttl or self.default_ttl
             
+            # Scaled int8 bytes: ~16x smaller than JSON text, ~4x smaller
+            # than float32, with zero-parse reads
             await self.redis_client.setex(
-                cache_key, 
-                cache_ttl, 
-                json.dumps(embedding)
+                cache_key,
+                cache_ttl,
+                _quantize_embedding(embedding)
             )
             logger.info(f"💾 Cached embedding: {cache_key[:20]}... (TTL: {cache_ttl}s)")
             return True
@@ -88,9 +192,106 @@ class CacheService:
             logger.error(f"Error caching embedding: {e}")
             return False
     
+    async def get_embeddings_cache_batch(self, texts: List[str], model_name: str) -> List[Optional[List[float]]]:
+        """Get cached embeddings for many texts in one pipelined round-trip"""
+        if not self.enabled or not texts:
+            return [None] * len(texts)
+
+        try:
+            keys = [
+                self._generate_cache_key("embedding", text, model_name=model_name)
+                for text in texts
+            ]
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                for key in keys:
+                    pipe.get(key)
+                cached_results = await pipe.execute()
+
+            hits = sum(1 for r in cached_results if r)
+            logger.info(f"📦 Embedding batch cache: {hits}/{len(texts)} hits")
+            return [
+                _dequantize_embedding(r) if r else None
+                for r in cached_results
+            ]
+
+        except Exception as e:
+            logger.error(f"Error getting embedding batch from cache: {e}")
+            return [None] * len(texts)
+
+    async def set_embeddings_cache_batch(self, pairs: List[tuple], model_name: str, ttl: Optional[int] = None) -> bool:
+        """Cache many (text, embedding) pairs in one pipelined round-trip"""
+        if not self.enabled or not pairs:
+            return False
+
+        try:
+            cache_ttl = ttl or self.default_ttl
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                for text, embedding in pairs:
+                    key = self._generate_cache_key("embedding", text, model_name=model_name)
+                    pipe.setex(key, cache_ttl, _quantize_embedding(embedding))
+                await pipe.execute()
+
+            logger.info(f"💾 Cached {len(pairs)} embeddings in one batch (TTL: {cache_ttl}s)")
+            return True
+
+        except Exception as e:
+            logger.error(f"Error caching embedding batch: {e}")
+            return False
+
+    async def _setex_with_doc_index(self, cache_key: str, cache_ttl: int, payload, doc_id: Optional[str]):
+        """SETEX a value and, when doc-scoped, register the key in the doc's index SET
+
+        The index makes invalidation an O(members) SMEMBERS+DEL instead of a
+        blocking KEYS scan over the whole keyspace.
+        """
+        if doc_id:
+            index_key = f"doc_index:{doc_id}"
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                pipe.setex(cache_key, cache_ttl, payload)
+                pipe.sadd(index_key, cache_key)
+                pipe.expire(index_key, cache_ttl)
+                await pipe.execute()
+        else:
+            await self.redis_client.setex(cache_key, cache_ttl, payload)
+
+    async def get_parsed_text_cache(self, digest: str) -> Optional[str]:
+        """Get extracted document text cached by file-content hash"""
+        if not self.enabled:
+            return None
+
+        try:
+            cached_result = await self.redis_client.get(f"pdf_text:{digest}")
+            if cached_result:
+                logger.info(f"📦 Cache HIT for parsed text: {digest[:12]}...")
+                return _maybe_decompress(cached_result).decode("utf-8")
+            return None
+        except Exception as e:
+            logger.error(f"Error getting parsed text from cache: {e}")
+            return None
+
+    async def set_parsed_text_cache(self, digest: str, text: str, ttl: Optional[int] = None) -> bool:
+        """Cache extracted document text by file-content hash
+
+        Kept much longer than query results: identical file bytes always
+        parse to identical text, so entries never go stale, only cold.
+        """
+        if not self.enabled:
+            return False
+
+        try:
+            cache_ttl = ttl or self.default_ttl * 24
+            await self.redis_client.setex(
+                f"pdf_text:{digest}", cache_ttl, _maybe_compress(text.encode("utf-8"))
+            )
+            logger.info(f"💾 Cached parsed text: {digest[:12]}... (TTL: {cache_ttl}s)")
+            return True
+        except Exception as e:
+            logger.error(f"Error caching parsed text: {e}")
+            return False
+
     async def get_query_cache(self, question: str, doc_id: Optional[str] = None, k: int = 10) -> Optional[dict]:
         """Get cached query result"""
-        if not self.redis_client:
+        if not self.enabled:
             return None
             
         try:
@@ -99,7 +300,7 @@ class CacheService:
             
             if cached_result:
                 logger.info(f"📦 Cache HIT for query: {cache_key[:20]}...")
-                return json.loads(cached_result)
+                return orjson.loads(_maybe_decompress(cached_result))
             else:
                 logger.debug(f"📭 Cache MISS for query: {cache_key[:20]}...")
                 return None
@@ -110,17 +311,15 @@ class CacheService:
     
     async def set_query_cache(self, question: str, result: dict, doc_id: Optional[str] = None, k: int = 10, ttl: Optional[int] = None) -> bool:
         """Cache query result"""
-        if not self.redis_client:
+        if not self.enabled:
             return False
             
         try:
             cache_key = self._generate_cache_key("query", question, doc_id=doc_id, k=k)
             cache_ttl = ttl or self.default_ttl
             
-            await self.redis_client.setex(
-                cache_key, 
-                cache_ttl, 
-                json.dumps(result)
+            await self._setex_with_doc_index(
+                cache_key, cache_ttl, _maybe_compress(orjson.dumps(result)), doc_id
             )
             logger.info(f"💾 Cached query result: {cache_key[:20]}... (TTL: {cache_ttl}s)")
             return True
@@ -131,19 +330,34 @@ class CacheService:
     
     async def get_similarity_search_cache(self, question: str, doc_id: Optional[str] = None, k: int = 10) -> Optional[List[dict]]:
         """Get cached similarity search results"""
-        if not self.redis_client:
+        if not self.enabled:
             return None
             
         try:
             cache_key = self._generate_cache_key("similarity", question, doc_id=doc_id, k=k)
             cached_result = await self.redis_client.get(cache_key)
-            
-            if cached_result:
-                logger.info(f"📦 Cache HIT for similarity search: {cache_key[:20]}...")
-                return json.loads(cached_result)
-            else:
+
+            if not cached_result:
                 logger.debug(f"📭 Cache MISS for similarity search: {cache_key[:20]}...")
                 return None
+
+            # Entries are (chunk_key, metadata) tuples; fetch the shared
+            # chunk bodies in a single MGET round-trip
+            entries = orjson.loads(_maybe_decompress(cached_result))
+            if not entries:
+                return []
+
+            bodies = await self.redis_client.mget([chunk_key for chunk_key, _ in entries])
+            if any(body is None for body in bodies):
+                # A referenced chunk body expired; treat as a full miss
+                logger.debug(f"📭 Cache MISS (stale chunk refs): {cache_key[:20]}...")
+                return None
+
+            logger.info(f"📦 Cache HIT for similarity search: {cache_key[:20]}...")
+            return [
+                {"page_content": _maybe_decompress(body).decode("utf-8"), "metadata": metadata}
+                for body, (_, metadata) in zip(bodies, entries)
+            ]
                 
         except Exception as e:
             logger.error(f"Error getting similarity search from cache: {e}")
@@ -151,28 +365,41 @@ class CacheService:
     
     async def set_similarity_search_cache(self, question: str, docs: List[dict], doc_id: Optional[str] = None, k: int = 10, ttl: Optional[int] = None) -> bool:
         """Cache similarity search results"""
-        if not self.redis_client:
+        if not self.enabled:
             return False
             
         try:
             cache_key = self._generate_cache_key("similarity", question, doc_id=doc_id, k=k)
             cache_ttl = ttl or self.default_ttl
             
-            # Serialize documents to cache-friendly format
-            serializable_docs = []
+            # Store chunk bodies content-addressed under chunk:{hash} so the
+            # same ~1KB text hit by many overlapping top-k queries lives in
+            # Redis exactly once. Entries are positional tuples, not dicts:
+            # no "chunk"/"metadata" key strings repeated k times per entry
+            entries = []
+            chunk_bodies = {}
             for doc in docs:
                 if hasattr(doc, 'page_content') and hasattr(doc, 'metadata'):
-                    serializable_docs.append({
-                        'page_content': doc.page_content,
-                        'metadata': doc.metadata
-                    })
+                    content, metadata = doc.page_content, doc.metadata
                 else:
-                    serializable_docs.append(doc)
-            
-            await self.redis_client.setex(
-                cache_key, 
-                cache_ttl, 
-                json.dumps(serializable_docs)
+                    content = doc.get('page_content', '')
+                    metadata = doc.get('metadata', {})
+                body = content.encode("utf-8")
+                chunk_key = f"chunk:{hashlib.blake2b(body, digest_size=8).hexdigest()}"
+                chunk_bodies[chunk_key] = body
+                entries.append((chunk_key, metadata))
+
+            # Bodies are shared across queries, so they outlive any one entry;
+            # they're content-addressed, so stale bodies are harmless
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                for chunk_key, body in chunk_bodies.items():
+                    pipe.setex(chunk_key, cache_ttl * 4, _maybe_compress(body))
+                await pipe.execute()
+
+            await self._setex_with_doc_index(
+                cache_key, cache_ttl,
+                _maybe_compress(orjson.dumps(entries, option=orjson.OPT_SERIALIZE_NUMPY)),
+                doc_id
             )
             logger.info(f"💾 Cached similarity search: {cache_key[:20]}... (TTL: {cache_ttl}s)")
             return True
@@ -183,28 +410,49 @@ class CacheService:
     
     async def invalidate_document_cache(self, doc_id: str):
         """Invalidate all cache entries related to a specific document"""
-        if not self.redis_client:
+        if not self.enabled:
             return
             
         try:
-            # Find all keys that might be related to this document
-            patterns = [
-                f"query:*doc_id={doc_id}*",
-                f"similarity:*doc_id={doc_id}*"
-            ]
-            
-            for pattern in patterns:
-                keys = await self.redis_client.keys(pattern)
-                if keys:
-                    await self.redis_client.delete(*keys)
-                    logger.info(f"🗑️ Invalidated {len(keys)} cache entries for document {doc_id}")
-                    
+            # The doc index SET records every cache key written for this
+            # document, so invalidation is one SMEMBERS plus one UNLINK instead
+            # of a blocking KEYS scan over the entire keyspace. UNLINK frees
+            # the values on a background thread, so even large entries don't
+            # stall other Redis clients
+            index_key = f"doc_index:{doc_id}"
+            keys = await self.redis_client.smembers(index_key)
+
+            if keys:
+                await self.redis_client.unlink(*keys, index_key)
+                logger.info(f"🗑️ Invalidated {len(keys)} cache entries for document {doc_id}")
+            else:
+                await self.redis_client.unlink(index_key)
+
         except Exception as e:
             logger.error(f"Error invalidating document cache: {e}")
+
+    async def delete_pattern(self, pattern: str) -> int:
+        """Delete every key matching a glob pattern (bulk maintenance)
+
+        Useful for sweeps the doc index doesn't cover, e.g. dropping all
+        embedding:* entries after a model change. Runs as a single Lua call
+        so the cursor loop happens server-side without blocking other
+        clients the way KEYS would.
+        """
+        if not self.enabled:
+            return 0
+
+        try:
+            deleted = await self.redis_client.eval(self.SCAN_DELETE_SCRIPT, 0, pattern)
+            logger.info(f"🗑️ Deleted {deleted} cache entries matching {pattern}")
+            return deleted
+        except Exception as e:
+            logger.error(f"Error deleting keys for pattern {pattern}: {e}")
+            return 0
     
     async def get_cache_stats(self) -> dict:
         """Get cache statistics"""
-        if not self.redis_client:
+        if not self.enabled:
             return {"status": "disconnected"}
             
         try:
@@ -1,41 +1,138 @@
 from app.db.session import async_session
 from app.services.cache_service import cache_service
+from app.services.semantic_cache import semantic_cache
 from app.utils.cached_embeddings import create_cached_embeddings
 # from langchain.vectorstores.pgvector import PGVector
 # from langchain.llms import OpenAI, HuggingFaceLLM
 
-async def query_documents(payload):
+import asyncio
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+LLM_MODEL = "google/flan-t5-base"
+
+# Process-wide singletons, built lazily on the first query. Re-creating these
+# per request means reloading a ~250MB flan-t5 checkpoint from disk every
+# time, which dominates query latency; built once, a query only pays for
+# inference.
+_embeddings = None
+_vectorstore = None
+_llm = None
+_tokenizer = None
+_init_lock = asyncio.Lock()
+
+# Leave headroom inside flan-t5's 512-token window for the prompt scaffolding
+# and the question itself
+_CONTEXT_TOKEN_BUDGET = 480
+
+# hnsw.ef_search trades recall for speed at query time; 40 comfortably covers
+# top-10 retrieval. Applied per connection via libpq options
+_HNSW_EF_SEARCH = int(os.getenv("HNSW_EF_SEARCH", "40"))
+
+def _build_query_resources(pgvector_conn: str):
+    """Construct the embedder, vectorstore, LLM and tokenizer (blocking, run off-loop)"""
     from langchain_community.vectorstores.pgvector import PGVector
     from langchain_huggingface import HuggingFaceEmbeddings
     from langchain_community.llms import HuggingFacePipeline
-    from transformers import pipeline
-    import os
+    from transformers import AutoTokenizer, pipeline
+
+    base_embeddings = HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL)
+    embeddings = create_cached_embeddings(base_embeddings, EMBEDDING_MODEL)
+
+    # use_jsonb matches the ingest-side store so both hit the same schema;
+    # ef_search is set through libpq options so every pooled connection
+    # searches the HNSW index at the configured breadth
+    vectorstore = PGVector(
+        connection_string=pgvector_conn,
+        embedding_function=embeddings,
+        collection_name="documents",
+        use_jsonb=True,
+        engine_args={
+            "connect_args": {"options": f"-c hnsw.ef_search={_HNSW_EF_SEARCH}"}
+        },
+    )
+
+    tokenizer = AutoTokenizer.from_pretrained(LLM_MODEL, use_fast=True)
+
+    # bf16 halves tensor bytes (doubling effective memory bandwidth) and
+    # torch.compile fuses the attention/matmul kernels — together a 2-4x
+    # speedup on generation, the query-path bottleneck on a cache miss.
+    # Fall back to the stock FP32 pipeline on hardware or torch builds that
+    # don't support either
+    try:
+        import torch
+        from transformers import AutoModelForSeq2SeqLM
+
+        model = AutoModelForSeq2SeqLM.from_pretrained(
+            LLM_MODEL, torch_dtype=torch.bfloat16
+        ).eval()
+        model = torch.compile(model, mode="reduce-overhead")
+        qa_pipeline = pipeline("text2text-generation", model=model, tokenizer=tokenizer)
+    except Exception as e:
+        logger.warning(f"⚠️ bf16/torch.compile unavailable, using FP32 pipeline: {e}")
+        qa_pipeline = pipeline("text2text-generation", model=LLM_MODEL)
+
+    llm = HuggingFacePipeline(pipeline=qa_pipeline)
+    return embeddings, vectorstore, llm, tokenizer
+
+async def _get_query_resources(pgvector_conn: str):
+    """Return the shared (embeddings, vectorstore, llm), building them once
+
+    Double-checked under an asyncio.Lock so concurrent first queries don't
+    each load the model; the blocking load itself runs in a worker thread.
+    """
+    global _embeddings, _vectorstore, _llm, _tokenizer
+    if _llm is None:
+        async with _init_lock:
+            if _llm is None:
+                _embeddings, _vectorstore, _llm, _tokenizer = await asyncio.to_thread(
+                    _build_query_resources, pgvector_conn
+                )
+    return _embeddings, _vectorstore, _llm, _tokenizer
+
+async def query_documents(payload):
+    # Accept the Pydantic model directly (no model_dump() copy in the route);
+    # plain dicts are still supported for existing callers
+    if isinstance(payload, dict):
+        question = payload.get("question", "")
+        doc_id = payload.get("doc_id")
+        k = payload.get("k", 10)
+        no_cache = payload.get("no_cache", False)
+    else:
+        question = payload.question
+        doc_id = payload.doc_id
+        k = getattr(payload, "k", 10)
+        no_cache = getattr(payload, "no_cache", False)
 
-    question = payload.get("question", "")
     if not question:
         return {"error": "No question provided."}
 
-    doc_id = payload.get("doc_id")
-    k = payload.get("k", 10)
-
     # Check cache for complete query result first
-    cached_result = await cache_service.get_query_cache(question, doc_id, k)
-    if cached_result:
-        return cached_result
-
-    # Load embeddings with caching wrapper
-    base_embeddings = HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2")
-    embeddings = create_cached_embeddings(base_embeddings, "sentence-transformers/all-MiniLM-L6-v2")
-    
+    if not no_cache:
+        cached_result = await cache_service.get_query_cache(question, doc_id, k)
+        if cached_result:
+            return cached_result
+
     pgvector_conn = os.getenv("PGVECTOR_CONN")
     if not pgvector_conn:
         return {"error": "PGVECTOR_CONN environment variable not set."}
-    
-    vectorstore = PGVector(
-        connection_string=pgvector_conn,
-        embedding_function=embeddings,
-        collection_name="documents"
-    )
+
+    embeddings, vectorstore, llm, tokenizer = await _get_query_resources(pgvector_conn)
+
+    # Semantic tier: a paraphrased repeat of an answered question reuses the
+    # prior response by embedding similarity, skipping the LLM entirely. The
+    # embedding itself comes through the cache-aware wrapper, so repeats
+    # don't pay an encoder pass here either
+    qvec = await embeddings.aembed_query(question)
+    if not no_cache:
+        # Scope hits to the same document filter and top-k so a similar
+        # question against another document can't answer this one
+        semantic_hit = semantic_cache.get(qvec, scope=(doc_id, k))
+        if semantic_hit is not None:
+            return semantic_hit
 
     # Check cache for similarity search results
     cached_docs = await cache_service.get_similarity_search_cache(question, doc_id, k)
@@ -48,33 +145,52 @@ async def query_documents(payload):
         filter_kwargs = {}
         if doc_id:
             filter_kwargs = {"metadata": {"document_id": doc_id}}
-        
-        docs = vectorstore.similarity_search(question, k=k, **filter_kwargs)
-        
+
+        # Search by the precomputed question vector so the store doesn't
+        # re-encode the question internally; the blocking psycopg2 round-trip
+        # runs in a worker thread so the event loop stays free for other
+        # requests
+        docs = await asyncio.to_thread(
+            vectorstore.similarity_search_by_vector, qvec, k=k, **filter_kwargs
+        )
+
         # Cache the similarity search results
         await cache_service.set_similarity_search_cache(question, docs, doc_id, k)
 
-    context = "\n".join([doc.page_content for doc in docs])
+    # Accumulate against a generous character budget (~6 chars/token of
+    # headroom) and stop reading page_content once it's spent, so a large
+    # top-k never materializes as one giant string just to be thrown away
+    parts = []
+    remaining = _CONTEXT_TOKEN_BUDGET * 6
+    for doc in docs:
+        content = doc.page_content
+        parts.append(content if len(content) <= remaining else content[:remaining])
+        remaining -= len(content) + 1
+        if remaining <= 0:
+            break
+    context = "\n".join(parts)
 
-    # Truncate context to fit model's max token limit (approx 200 words)
-    max_words = 200
-    context_words = context.split()
-    if len(context_words) > max_words:
-        context = " ".join(context_words[:max_words])
+    # Truncate context against flan-t5's actual token limit instead of an
+    # approximate word count: the Rust tokenizer counts real tokens, so the
+    # window is neither wasted (200 words undershoots) nor overrun
+    input_ids = tokenizer(
+        context, truncation=True, max_length=_CONTEXT_TOKEN_BUDGET,
+        add_special_tokens=False
+    )["input_ids"]
+    context = tokenizer.decode(input_ids, skip_special_tokens=True)
 
-    # Generate answer using HuggingFacePipeline
-    qa_pipeline = pipeline("text2text-generation", model="google/flan-t5-base")
-    llm = HuggingFacePipeline(pipeline=qa_pipeline)
     prompt = (
         "Answer the question based only on the context below. "
         # "If unsure, say 'I don't know.'\n\n"
         f"Context: {context}\n\nQuestion: {question}\n\nAnswer:"
     )
     answer = llm(prompt)
-    
+
     result = {"answer": answer, "context": context}
-    
+
     # Cache the complete result
-    await cache_service.set_query_cache(question, result, doc_id, k)
-    
+    if not no_cache:
+        await cache_service.set_query_cache(question, result, doc_id, k)
+        semantic_cache.add(qvec, result, scope=(doc_id, k))
+
     return result
@@ -1,26 +1,39 @@
+import uuid
+
+from sqlalchemy import update
+
+from app.db.models import Document
 from app.db.session import async_session
 
 async def select_documents(payload):
-    # Mark docs as selected for RAG (requires 'selected' field in Document model)
-    doc_ids = payload.get("doc_ids", [])
+    # Mark docs as selected for RAG
+    doc_ids = payload.get("doc_ids", []) if isinstance(payload, dict) else payload.doc_ids
     if not doc_ids:
         return {"error": "No doc_ids provided."}
 
-    from app.db.models import Document
-    import uuid
+    # Validate UUIDs client-side so malformed ids never reach Postgres
+    valid_ids = []
+    for doc_id in doc_ids:
+        try:
+            valid_ids.append(uuid.UUID(doc_id))
+        except (ValueError, AttributeError, TypeError):
+            continue
+    if not valid_ids:
+        return {"selected_docs": []}
 
-    updated = []
+    # DB/session failures propagate so the route can answer 500; only
+    # malformed ids are swallowed (above), matching the old per-id loop
     async with async_session() as session:
         async with session.begin():
-            for doc_id in doc_ids:
-                try:
-                    doc_uuid = uuid.UUID(doc_id)
-                    doc = await session.get(Document, doc_uuid)
-                    if doc:
-                        # If 'selected' field exists, set it True. Otherwise, skip.
-                        if hasattr(doc, 'selected'):
-                            doc.selected = True
-                            updated.append(str(doc.id))
-                except Exception as e:
-                    continue
+            # One UPDATE ... WHERE id = ANY(...) RETURNING id instead of a
+            # SELECT + UPDATE pair per document: N round-trips become one
+            # index scan, with no per-row ORM hydration
+            stmt = (
+                update(Document)
+                .where(Document.id.in_(valid_ids))
+                .values(selected=True)
+                .returning(Document.id)
+            )
+            result = await session.execute(stmt)
+            updated = [str(row[0]) for row in result]
     return {"selected_docs": updated}
@@ -0,0 +1,91 @@
+"""
+In-memory semantic cache over normalized query embeddings
+
+Catches paraphrased repeats that the exact-match Redis keys miss: if a new
+question's embedding is close enough (cosine similarity) to a previously
+answered one, the prior response is reused and the LLM call is skipped
+entirely. Brute-force numpy inner product stands in for a FAISS flat index;
+at a few hundred cached entries of dim 384 the matmul is microseconds and
+needs no extra dependency.
+"""
+import logging
+import time
+from typing import Any, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+class SemanticCache:
+    """LRU + TTL cache keyed by embedding similarity instead of exact text"""
+
+    def __init__(self, threshold: float = 0.85, maxsize: int = 256, ttl: int = 300):
+        self.threshold = threshold
+        self.maxsize = maxsize
+        self.ttl = ttl
+        # Parallel structures: entries[i] = (vector, response, expires_at,
+        # scope) matches row i of the (n, dim) L2-normalized vector matrix
+        self._entries: List[tuple] = []
+        self._vectors: Optional[np.ndarray] = None
+
+    @staticmethod
+    def _normalize(embedding) -> np.ndarray:
+        v = np.asarray(embedding, dtype=np.float32)
+        norm = float(np.linalg.norm(v))
+        return v / norm if norm else v
+
+    def _rebuild(self):
+        self._vectors = (
+            np.stack([entry[0] for entry in self._entries]) if self._entries else None
+        )
+
+    def _evict_expired(self):
+        now = time.monotonic()
+        live = [entry for entry in self._entries if entry[2] > now]
+        if len(live) != len(self._entries):
+            self._entries = live
+            self._rebuild()
+
+    def get(self, embedding, scope: Any = None) -> Optional[Any]:
+        """Return the cached response closest to embedding, if similar enough
+
+        Only entries stored under the same scope (e.g. (doc_id, k)) are
+        eligible: a near-identical question scoped to another document
+        must not answer this one.
+        """
+        self._evict_expired()
+        if self._vectors is None:
+            return None
+
+        q = self._normalize(embedding)
+        sims = self._vectors @ q
+        # Mask out entries from other scopes before picking the best match
+        for i, entry in enumerate(self._entries):
+            if entry[3] != scope:
+                sims[i] = -1.0
+        best = int(np.argmax(sims))
+        if sims[best] < self.threshold:
+            return None
+
+        # Bump the hit to the warm end so LRU eviction spares it
+        entry = self._entries.pop(best)
+        self._entries.append(entry)
+        self._rebuild()
+        logger.info(f"📦 Semantic cache HIT (similarity {sims[best]:.3f})")
+        return entry[1]
+
+    def add(self, embedding, response: Any, scope: Any = None):
+        """Store a response under its (normalized) query embedding and scope"""
+        self._entries.append(
+            (self._normalize(embedding), response, time.monotonic() + self.ttl, scope)
+        )
+        if len(self._entries) > self.maxsize:
+            self._entries = self._entries[-self.maxsize:]
+        self._rebuild()
+
+    def clear(self):
+        self._entries = []
+        self._vectors = None
+
+# Global semantic cache instance
+semantic_cache = SemanticCache()
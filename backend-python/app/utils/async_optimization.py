@@ -1,5 +1,8 @@
 import asyncio
 import functools
+import random
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
 from typing import Any, Callable, Dict, Optional, TypeVar, Awaitable
 from concurrent.futures import ThreadPoolExecutor
 import logging
@@ -11,93 +14,151 @@ T = TypeVar('T')
 class AsyncOptimizer:
     """Utilities for async optimization"""
     
-    def __init__(self, max_workers: int = 4):
+    def __init__(self, max_workers: int = 4, cache_size: int = 1024):
         self.thread_pool = ThreadPoolExecutor(max_workers=max_workers)
-        self.cache: Dict[str, Any] = {}
-        self.cache_lock = asyncio.Lock()
-    
+        # Bounded LRU keyed insertion-ordered: (value, expires_at) entries,
+        # evicted from the cold end so RSS can't grow without limit
+        self.cache: "OrderedDict[str, Any]" = OrderedDict()
+        self.cache_size = cache_size
+        # One lock per key so unrelated computations don't serialize behind
+        # a single global lock on the event loop hot path
+        self.key_locks: Dict[str, asyncio.Lock] = {}
+
     async def run_in_thread(self, func: Callable[..., T], *args, **kwargs) -> T:
         """Run CPU-intensive function in thread pool"""
-        loop = asyncio.get_event_loop()
+        # get_running_loop skips the policy lookup (and the 3.10+
+        # deprecation path) that get_event_loop goes through
+        loop = asyncio.get_running_loop()
         return await loop.run_in_executor(self.thread_pool, func, *args, **kwargs)
-    
-    async def cached_call(self, key: str, func: Callable[..., Awaitable[T]], 
+
+    def _cache_get(self, key: str, now: float) -> Optional[tuple]:
+        """Return the live entry for key, dropping it if expired"""
+        entry = self.cache.get(key)
+        if entry is None:
+            return None
+        if now >= entry[1]:
+            del self.cache[key]
+            return None
+        self.cache.move_to_end(key)
+        return entry
+
+    async def cached_call(self, key: str, func: Callable[..., Awaitable[T]],
                          *args, ttl: int = 300, **kwargs) -> T:
-        """Cached async function call with TTL"""
-        async with self.cache_lock:
-            if key in self.cache:
-                result, timestamp = self.cache[key]
-                if asyncio.get_event_loop().time() - timestamp < ttl:
+        """Cached async function call with TTL, LRU-bounded and single-flight"""
+        loop = asyncio.get_running_loop()
+        entry = self._cache_get(key, loop.time())
+        if entry is not None:
+            logger.debug(f"Cache hit for {key}")
+            return entry[0]
+
+        lock = self.key_locks.setdefault(key, asyncio.Lock())
+        try:
+            async with lock:
+                # Another waiter may have computed the value while we queued;
+                # re-check so concurrent misses collapse into one call
+                now = loop.time()
+                entry = self._cache_get(key, now)
+                if entry is not None:
                     logger.debug(f"Cache hit for {key}")
-                    return result
-                else:
-                    del self.cache[key]
-        
-        # Execute function
-        result = await func(*args, **kwargs)
-        
-        async with self.cache_lock:
-            self.cache[key] = (result, asyncio.get_event_loop().time())
-        
+                    return entry[0]
+
+                result = await func(*args, **kwargs)
+
+                self.cache[key] = (result, now + ttl)
+                self.cache.move_to_end(key)
+                while len(self.cache) > self.cache_size:
+                    self.cache.popitem(last=False)
+        finally:
+            self.key_locks.pop(key, None)
+
         logger.debug(f"Cache miss for {key}")
         return result
     
     def batch_processor(self, batch_size: int = 10, timeout: float = 1.0):
-        """Decorator for batching async operations"""
+        """Decorator for batching async operations
+
+        Calls register a Future on a shared queue and a single collector
+        task drains it, so N concurrent calls share one batching window
+        instead of each sleeping out the full timeout. Every caller gets
+        its own result back through its Future.
+        """
         def decorator(func: Callable):
-            batch_queue = []
-            batch_lock = asyncio.Lock()
-            
+            queue: asyncio.Queue = asyncio.Queue()
+            flusher_task: Optional[asyncio.Task] = None
+
+            async def _drain_loop():
+                loop = asyncio.get_running_loop()
+                while True:
+                    batch = [await queue.get()]
+                    # Collect until the batch fills or the window closes
+                    deadline = loop.time() + timeout
+                    while len(batch) < batch_size:
+                        remaining = deadline - loop.time()
+                        if remaining <= 0:
+                            break
+                        try:
+                            batch.append(await asyncio.wait_for(queue.get(), remaining))
+                        except asyncio.TimeoutError:
+                            break
+
+                    results = await asyncio.gather(
+                        *[func(*args, **kwargs) for args, kwargs, _ in batch],
+                        return_exceptions=True,
+                    )
+                    for (_, _, fut), result in zip(batch, results):
+                        if fut.cancelled():
+                            continue
+                        if isinstance(result, BaseException):
+                            fut.set_exception(result)
+                        else:
+                            fut.set_result(result)
+
             @functools.wraps(func)
             async def wrapper(*args, **kwargs):
-                async with batch_lock:
-                    batch_queue.append((args, kwargs))
-                    
-                    if len(batch_queue) >= batch_size:
-                        current_batch = batch_queue.copy()
-                        batch_queue.clear()
-                        
-                        # Process batch
-                        tasks = [func(*item[0], **item[1]) for item in current_batch]
-                        return await asyncio.gather(*tasks)
-                
-                # Wait for timeout or batch to fill
-                await asyncio.sleep(timeout)
-                async with batch_lock:
-                    if batch_queue:
-                        current_batch = batch_queue.copy()
-                        batch_queue.clear()
-                        tasks = [func(*item[0], **item[1]) for item in current_batch]
-                        results = await asyncio.gather(*tasks)
-                        return results[0] if len(results) == 1 else results
-            
+                nonlocal flusher_task
+                if flusher_task is None or flusher_task.done():
+                    flusher_task = asyncio.create_task(_drain_loop())
+                fut = asyncio.get_running_loop().create_future()
+                await queue.put((args, kwargs, fut))
+                return await fut
+
             return wrapper
         return decorator
 
 # Global optimizer instance
 async_optimizer = AsyncOptimizer()
 
-def async_retry(max_retries: int = 3, delay: float = 1.0, backoff: float = 2.0):
-    """Decorator for retrying async functions with exponential backoff"""
+def async_retry(max_retries: int = 3, delay: float = 1.0, backoff: float = 2.0,
+                max_delay: float = 30.0, jitter: str = "full"):
+    """Decorator for retrying async functions with capped, jittered backoff
+
+    Full jitter (sleep uniformly in [0, delay]) keeps clients from retrying
+    in lockstep during a shared outage; max_delay caps the exponential growth.
+    Cancellation is never retried.
+    """
     def decorator(func: Callable):
         @functools.wraps(func)
         async def wrapper(*args, **kwargs):
             last_exception = None
             current_delay = delay
-            
+
             for attempt in range(max_retries + 1):
                 try:
                     return await func(*args, **kwargs)
+                except asyncio.CancelledError:
+                    raise
                 except Exception as e:
                     last_exception = e
                     if attempt == max_retries:
                         logger.error(f"Function {func.__name__} failed after {max_retries} retries: {e}")
                         raise
-                    
-                    logger.warning(f"Attempt {attempt + 1} failed for {func.__name__}: {e}. Retrying in {current_delay}s")
-                    await asyncio.sleep(current_delay)
+
+                    capped = min(current_delay, max_delay)
+                    sleep_for = random.uniform(0, capped) if jitter == "full" else capped
+                    logger.warning(f"Attempt {attempt + 1} failed for {func.__name__}: {e}. Retrying in {sleep_for:.2f}s")
+                    await asyncio.sleep(sleep_for)
                     current_delay *= backoff
-            
+
             raise last_exception
         return wrapper
     return decorator
@@ -115,48 +176,88 @@ def async_timeout(timeout: float):
         return wrapper
     return decorator
 
-async def gather_with_concurrency(coro_list: list, max_concurrency: int = 10):
-    """Execute coroutines with limited concurrency"""
+async def gather_with_concurrency(coro_list, max_concurrency: int = 10,
+                                  return_exceptions: bool = False):
+    """Execute awaitables with limited concurrency, preserving order
+
+    Tasks are spawned only as semaphore slots free up, so at most
+    max_concurrency of them are live at once instead of eagerly wrapping
+    all N. Items may be coroutines or zero-arg callables returning
+    awaitables; factories aren't invoked until their slot opens, which
+    keeps even the coroutine frames at O(max_concurrency) for large inputs.
+    """
     semaphore = asyncio.Semaphore(max_concurrency)
-    
-    async def sem_coro(coro):
-        async with semaphore:
-            return await coro
-    
-    return await asyncio.gather(*[sem_coro(coro) for coro in coro_list])
+    results: list = []
+    tasks = []
+
+    async def _run(index: int, aw):
+        try:
+            if callable(aw):
+                aw = aw()
+            results[index] = await aw
+        except Exception as e:
+            if not return_exceptions:
+                raise
+            results[index] = e
+        finally:
+            semaphore.release()
+
+    for aw in coro_list:
+        await semaphore.acquire()
+        results.append(None)
+        tasks.append(asyncio.create_task(_run(len(results) - 1, aw)))
+
+    await asyncio.gather(*tasks)
+    return results
 
 class ConnectionPool:
-    """Simple async connection pool"""
-    
+    """Simple async connection pool
+
+    A Semaphore counts free capacity and a plain deque holds warm
+    connections. The semaphore already provides all the cross-task
+    waiting, so the idle list needs no Queue waiter machinery — append
+    and popleft are enough, and far cheaper per checkout.
+    """
+
     def __init__(self, create_connection: Callable, max_size: int = 10):
         self.create_connection = create_connection
         self.max_size = max_size
-        self.pool = asyncio.Queue(maxsize=max_size)
-        self.current_size = 0
-        self.lock = asyncio.Lock()
-    
+        self._sem = asyncio.Semaphore(max_size)
+        self._idle: deque = deque()
+
     async def get_connection(self):
-        """Get connection from pool"""
+        """Check a connection out of the pool"""
+        await self._sem.acquire()
+        if self._idle:
+            return self._idle.popleft()
         try:
-            return self.pool.get_nowait()
-        except asyncio.QueueEmpty:
-            async with self.lock:
-                if self.current_size < self.max_size:
-                    self.current_size += 1
-                    return await self.create_connection()
-                else:
-                    return await self.pool.get()
-    
+            return await self.create_connection()
+        except BaseException:
+            # The slot was never filled; give it back
+            self._sem.release()
+            raise
+
     async def return_connection(self, connection):
-        """Return connection to pool"""
+        """Return a connection to the pool"""
         try:
-            self.pool.put_nowait(connection)
-        except asyncio.QueueFull:
-            # Pool is full, discard connection
-            await self.close_connection(connection)
-            async with self.lock:
-                self.current_size -= 1
-    
+            if len(self._idle) < self.max_size:
+                self._idle.append(connection)
+            else:
+                # Shouldn't happen while the semaphore bounds checkouts,
+                # but never let the idle list grow past the pool size
+                await self.close_connection(connection)
+        finally:
+            self._sem.release()
+
+    @asynccontextmanager
+    async def acquire(self):
+        """Context-managed checkout: returns the connection on exit"""
+        connection = await self.get_connection()
+        try:
+            yield connection
+        finally:
+            await self.return_connection(connection)
+
     async def close_connection(self, connection):
         """Close connection (override in subclass)"""
         if hasattr(connection, 'close'):
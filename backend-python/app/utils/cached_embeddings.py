@@ -1,58 +1,116 @@
 """
 Cached embeddings wrapper for LangChain embeddings
 """
+import asyncio
+import hashlib
 import logging
-from typing import List, Optional
+import os
+from collections import OrderedDict
+from typing import Dict, List, Optional
 from langchain_core.embeddings import Embeddings
 from app.services.cache_service import cache_service
+from app.utils.async_optimization import async_optimizer
 
 logger = logging.getLogger(__name__)
 
+# Texts longer than this are almost never repeated verbatim, so a cache
+# lookup is a guaranteed-miss Redis round-trip; skip the cache entirely
+MAX_CACHE_TEXT_LEN = 4096
+
+# In-process LRU in front of Redis for query embeddings: hot queries skip
+# even the Redis round-trip. ~5000 MiniLM vectors is a few MB of heap
+EMBED_LRU_SIZE = int(os.getenv("EMBED_LRU_SIZE", "5000"))
+
+# Process-wide hit/miss counters, shared by every CachedEmbeddings instance
+# and surfaced on the admin cache-stats endpoint. Plain ints are atomic
+# enough under the GIL; no metrics dependency needed
+_stats = {"hits": 0, "misses": 0, "short_circuits": 0}
+
+def get_embed_cache_stats() -> dict:
+    """Snapshot of embedding-cache hit/miss counters for this process"""
+    return dict(_stats)
+
 class CachedEmbeddings(Embeddings):
     """Wrapper around LangChain embeddings that adds Redis caching"""
     
     def __init__(self, embeddings: Embeddings, model_name: str = "default"):
         self.embeddings = embeddings
         self.model_name = model_name
+        # Single-flight table: concurrent identical queries await one
+        # in-progress embedding instead of each running the model
+        self._inflight: Dict[str, asyncio.Future] = {}
+        # Resolve the async methods once; per-call hasattr on hot paths is
+        # a wasted dict lookup (or worse, a __getattr__ round-trip)
+        self._aembed_documents = getattr(embeddings, 'aembed_documents', None)
+        self._aembed_query = getattr(embeddings, 'aembed_query', None)
+        # Bounded per-process LRU in front of Redis for query embeddings
+        self._local: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._local_maxsize = EMBED_LRU_SIZE
+
+    def _local_put(self, key: str, embedding: List[float]) -> None:
+        """Insert into the in-process LRU, evicting from the cold end"""
+        self._local[key] = embedding
+        self._local.move_to_end(key)
+        while len(self._local) > self._local_maxsize:
+            self._local.popitem(last=False)
         
     async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
         """Embed multiple documents with caching"""
         if not texts:
             return []
-            
-        results = []
-        uncached_texts = []
-        uncached_indices = []
-        
-        # Check cache for each text
-        for i, text in enumerate(texts):
-            cached_embedding = await cache_service.get_embedding_cache(text, self.model_name)
-            if cached_embedding:
-                results.append(cached_embedding)
-            else:
-                results.append(None)  # Placeholder
-                uncached_texts.append(text)
-                uncached_indices.append(i)
-        
+
+        # Degraded mode (Redis down/disabled): skip the cache bookkeeping
+        # entirely and go straight to the model
+        if not cache_service.enabled:
+            if self._aembed_documents is not None:
+                return await self._aembed_documents(texts)
+            return await async_optimizer.run_in_thread(
+                self.embeddings.embed_documents, texts
+            )
+
+        # Check cache for all texts in one pipelined round-trip
+        results = await cache_service.get_embeddings_cache_batch(texts, self.model_name)
+
+        # Collapse duplicate uncached texts (overlapping chunks repeat) so
+        # each distinct string is embedded and cached exactly once, then
+        # fanned back out to every position it appeared at
+        uncached_positions: Dict[str, List[int]] = {}
+        for i, cached_embedding in enumerate(results):
+            if not cached_embedding:
+                uncached_positions.setdefault(texts[i], []).append(i)
+
+        uncached_total = sum(len(v) for v in uncached_positions.values())
+        _stats["hits"] += len(texts) - uncached_total
+        _stats["misses"] += uncached_total
+
         # Generate embeddings for uncached texts
-        if uncached_texts:
+        if uncached_positions:
+            uncached_texts = list(uncached_positions)
             logger.info(f"🔄 Generating {len(uncached_texts)} new embeddings")
             try:
-                if hasattr(self.embeddings, 'aembed_documents'):
-                    new_embeddings = await self.embeddings.aembed_documents(uncached_texts)
+                if self._aembed_documents is not None:
+                    new_embeddings = await self._aembed_documents(uncached_texts)
                 else:
-                    # Fallback to sync method
-                    new_embeddings = self.embeddings.embed_documents(uncached_texts)
+                    # Sync fallback runs in the shared thread pool so model
+                    # inference doesn't block the event loop
+                    new_embeddings = await async_optimizer.run_in_thread(
+                        self.embeddings.embed_documents, uncached_texts
+                    )
             except Exception as e:
                 logger.error(f"Error generating embeddings: {e}")
-                # Return sync embeddings as fallback
-                new_embeddings = self.embeddings.embed_documents(uncached_texts)
-            
-            # Cache new embeddings and update results
-            for i, (text, embedding) in enumerate(zip(uncached_texts, new_embeddings)):
-                await cache_service.set_embedding_cache(text, self.model_name, embedding)
-                results[uncached_indices[i]] = embedding
-        
+                # Sync embeddings as fallback, still off-loop
+                new_embeddings = await async_optimizer.run_in_thread(
+                    self.embeddings.embed_documents, uncached_texts
+                )
+
+            # Cache new embeddings in one batch and update results
+            await cache_service.set_embeddings_cache_batch(
+                list(zip(uncached_texts, new_embeddings)), self.model_name
+            )
+            for text, embedding in zip(uncached_texts, new_embeddings):
+                for i in uncached_positions[text]:
+                    results[i] = embedding
+
         return results
     
     def embed_documents(self, texts: List[str]) -> List[List[float]]:
@@ -63,33 +121,74 @@ class CachedEmbeddings(Embeddings):
     
     async def aembed_query(self, text: str) -> List[float]:
         """Embed a single query with caching"""
-        # Check cache first
-        try:
-            cached_embedding = await cache_service.get_embedding_cache(text, self.model_name)
-            if cached_embedding:
-                return cached_embedding
-        except Exception as e:
-            logger.warning(f"Cache lookup failed: {e}")
-        
-        # Generate new embedding
-        logger.info("🔄 Generating new query embedding")
-        try:
-            if hasattr(self.embeddings, 'aembed_query'):
-                embedding = await self.embeddings.aembed_query(text)
-            else:
-                # Fallback to sync method
-                embedding = self.embeddings.embed_query(text)
-        except Exception as e:
-            logger.error(f"Error generating query embedding: {e}")
-            # Final fallback to sync method
-            embedding = self.embeddings.embed_query(text)
-        
-        # Cache the result
+        # Empty/whitespace queries and very long texts are guaranteed cache
+        # misses — skip the Redis round-trips entirely for them
+        cacheable = bool(text) and not text.isspace() and len(text) <= MAX_CACHE_TEXT_LEN
+        key = hashlib.blake2b(
+            f"{self.model_name}:{text}".encode(), digest_size=16
+        ).hexdigest()
+
+        # Check the in-process LRU, then Redis
+        if cacheable:
+            local = self._local.get(key)
+            if local is not None:
+                self._local.move_to_end(key)
+                _stats["hits"] += 1
+                return local
+            try:
+                cached_embedding = await cache_service.get_embedding_cache(text, self.model_name)
+                if cached_embedding:
+                    self._local_put(key, cached_embedding)
+                    _stats["hits"] += 1
+                    return cached_embedding
+            except Exception as e:
+                logger.warning(f"Cache lookup failed: {e}")
+
+        _stats["misses" if cacheable else "short_circuits"] += 1
+
+        # Coalesce concurrent misses for the same text into one model call
+        flight_key = key
+        inflight = self._inflight.get(flight_key)
+        if inflight is not None:
+            return await inflight
+
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._inflight[flight_key] = future
         try:
-            await cache_service.set_embedding_cache(text, self.model_name, embedding)
-        except Exception as e:
-            logger.warning(f"Failed to cache embedding: {e}")
-            
+            # Generate new embedding
+            logger.info("🔄 Generating new query embedding")
+            try:
+                if self._aembed_query is not None:
+                    embedding = await self._aembed_query(text)
+                else:
+                    # Sync fallback runs in the shared thread pool so model
+                    # inference doesn't block the event loop
+                    embedding = await async_optimizer.run_in_thread(
+                        self.embeddings.embed_query, text
+                    )
+            except Exception as e:
+                logger.error(f"Error generating query embedding: {e}")
+                # Final sync fallback, still off-loop
+                embedding = await async_optimizer.run_in_thread(
+                    self.embeddings.embed_query, text
+                )
+            future.set_result(embedding)
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark retrieved so the loop doesn't warn when nobody awaited it
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(flight_key, None)
+
+        # Only the leader writes the caches, exactly once
+        if cacheable:
+            self._local_put(key, embedding)
+            try:
+                await cache_service.set_embedding_cache(text, self.model_name, embedding)
+            except Exception as e:
+                logger.warning(f"Failed to cache embedding: {e}")
+
         return embedding
     
     def embed_query(self, text: str) -> List[float]:
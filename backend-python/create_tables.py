@@ -1,14 +1,32 @@
+import os
+
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
 from app.db.models import Base
 from app.db.session import DATABASE_URL
 import asyncio
 
 async def create_tables():
     """Create all database tables"""
-    engine = create_async_engine(DATABASE_URL, echo=True)
+    # One-shot script: no pooling, and per-statement SQL logging only when
+    # explicitly requested (echo=True formats every DDL statement)
+    engine = create_async_engine(
+        DATABASE_URL,
+        echo=os.getenv("SQL_ECHO") == "1",
+        poolclass=NullPool,
+    )
     async with engine.begin() as conn:
+        # Enable pgvector before creating tables that use Vector columns
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
         # Create tables
         await conn.run_sync(Base.metadata.create_all)
+        # HNSW index for fast approximate nearest-neighbor search
+        await conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_chunks_embedding "
+            "ON chunks USING hnsw (embedding vector_cosine_ops) "
+            "WITH (m = 16, ef_construction = 64)"
+        ))
     await engine.dispose()
     print("✅ Database tables created successfully!")
 
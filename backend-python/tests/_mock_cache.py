@@ -0,0 +1,42 @@
+"""
+Prototype mocks shared across test modules
+
+MagicMock construction is surprisingly expensive once specs and magic
+methods are involved. Each common shape is built once at import time and
+tests take shallow copies, so per-test mock setup is a copy.copy instead
+of re-wiring the same attribute chains.
+"""
+import copy
+from unittest.mock import AsyncMock, MagicMock
+
+from app.db.models import Document
+
+# A Document row as routes see it; spec keeps attribute typos loud
+_DOC_MOCK = MagicMock(spec=Document)
+_DOC_MOCK.id = "test-uuid"
+_DOC_MOCK.filename = "test.txt"
+
+# An async_session() context manager: calling it yields a context whose
+# __aenter__ returns the session instance
+_SESSION_INSTANCE = MagicMock()
+_SESSION_CONTEXT = MagicMock()
+_SESSION_CONTEXT.__aenter__ = AsyncMock(return_value=_SESSION_INSTANCE)
+_SESSION_CONTEXT.__aexit__ = AsyncMock(return_value=None)
+
+
+def document_mock(**attrs) -> MagicMock:
+    """Copy of the prototype Document mock, with optional attribute overrides"""
+    doc = copy.copy(_DOC_MOCK)
+    for name, value in attrs.items():
+        setattr(doc, name, value)
+    return doc
+
+
+def async_session_mock():
+    """(session_factory, session_instance) pair for patching async_session"""
+    instance = copy.copy(_SESSION_INSTANCE)
+    context = copy.copy(_SESSION_CONTEXT)
+    context.__aenter__ = AsyncMock(return_value=instance)
+    context.__aexit__ = AsyncMock(return_value=None)
+    factory = MagicMock(return_value=context)
+    return factory, instance
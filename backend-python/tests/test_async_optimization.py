@@ -1,8 +1,13 @@
 import pytest
 import asyncio
-from app.utils.async_optimization import AsyncOptimizer, async_retry, async_timeout
+from app.utils.async_optimization import (
+    AsyncOptimizer,
+    ConnectionPool,
+    async_retry,
+    async_timeout,
+    gather_with_concurrency,
+)
 
-@pytest.mark.asyncio
 async def test_async_optimizer_basic():
     """Test basic AsyncOptimizer functionality"""
     optimizer = AsyncOptimizer(max_workers=2)
@@ -14,7 +19,53 @@ async def test_async_optimizer_basic():
     result = await optimizer.run_in_thread(cpu_bound_task, 5)
     assert result == 10
 
-@pytest.mark.asyncio 
+async def test_cached_call_single_flight():
+    """Concurrent misses for the same key collapse into one call"""
+    optimizer = AsyncOptimizer(max_workers=2)
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "value"
+
+    results = await asyncio.gather(
+        *[optimizer.cached_call("key", compute, ttl=60) for _ in range(5)]
+    )
+
+    assert results == ["value"] * 5
+    assert calls == 1
+
+async def test_cached_call_lru_bound():
+    """The call cache evicts its oldest entries past cache_size"""
+    optimizer = AsyncOptimizer(max_workers=2, cache_size=2)
+
+    async def compute(value):
+        return value
+
+    for i in range(4):
+        await optimizer.cached_call(f"key{i}", compute, i, ttl=60)
+
+    assert len(optimizer.cache) == 2
+    assert "key0" not in optimizer.cache
+    assert "key3" in optimizer.cache
+
+async def test_batch_processor_coalesces_calls():
+    """Concurrent calls share one batching window and each gets its result"""
+    optimizer = AsyncOptimizer(max_workers=2)
+    batches_seen = []
+
+    @optimizer.batch_processor(batch_size=3, timeout=0.05)
+    async def process(value):
+        batches_seen.append(value)
+        return value * 2
+
+    results = await asyncio.gather(process(1), process(2), process(3))
+
+    assert sorted(results) == [2, 4, 6]
+    assert sorted(batches_seen) == [1, 2, 3]
+
 async def test_async_retry_decorator():
     """Test async retry decorator"""
     call_count = 0
@@ -31,7 +82,93 @@ async def test_async_retry_decorator():
     assert result == "success"
     assert call_count == 2
 
-@pytest.mark.asyncio
+async def test_connection_pool_reuses_connections():
+    """Returned connections are handed out again instead of re-created"""
+    created = 0
+
+    async def create_connection():
+        nonlocal created
+        created += 1
+        return object()
+
+    pool = ConnectionPool(create_connection, max_size=2)
+
+    async with pool.acquire() as conn1:
+        pass
+    async with pool.acquire() as conn2:
+        assert conn2 is conn1
+
+    assert created == 1
+
+async def test_connection_pool_respects_max_size():
+    """Checkout blocks at max_size until a connection is returned"""
+    async def create_connection():
+        return object()
+
+    pool = ConnectionPool(create_connection, max_size=1)
+    conn = await pool.get_connection()
+
+    waiter = asyncio.create_task(pool.get_connection())
+    await asyncio.sleep(0.01)
+    assert not waiter.done()
+
+    await pool.return_connection(conn)
+    assert await asyncio.wait_for(waiter, timeout=1) is conn
+
+async def test_gather_with_concurrency_limits_and_orders():
+    """Concurrency never exceeds the limit and results keep input order"""
+    active = 0
+    peak = 0
+
+    async def work(value):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+        return value
+
+    results = await gather_with_concurrency(
+        (work(i) for i in range(10)), max_concurrency=3
+    )
+
+    assert results == list(range(10))
+    assert peak <= 3
+
+async def test_gather_with_concurrency_lazy_factories():
+    """Factories are only invoked once a slot frees up"""
+    started = []
+
+    def make(value):
+        async def work():
+            started.append(value)
+            await asyncio.sleep(0.01)
+            return value
+        return work
+
+    results = await gather_with_concurrency(
+        [make(i) for i in range(6)], max_concurrency=2
+    )
+
+    assert results == list(range(6))
+    assert started[:2] == [0, 1]
+
+async def test_gather_with_concurrency_return_exceptions():
+    """With return_exceptions, failures come back in place of results"""
+    async def ok(value):
+        return value
+
+    async def boom():
+        raise ValueError("boom")
+
+    results = await gather_with_concurrency(
+        [ok(1), boom(), ok(3)], max_concurrency=2, return_exceptions=True
+    )
+
+    assert results[0] == 1
+    assert isinstance(results[1], ValueError)
+    assert results[2] == 3
+
 async def test_async_timeout_decorator():
     """Test async timeout decorator"""
     
@@ -43,7 +180,6 @@ async def test_async_timeout_decorator():
     with pytest.raises(asyncio.TimeoutError):
         await slow_function()
 
-@pytest.mark.asyncio
 async def test_async_timeout_success():
     """Test async timeout decorator with fast function"""
     
@@ -2,10 +2,14 @@
 Tests for Redis caching service
 """
 import pytest
-import pytest_asyncio
 import json
+import numpy as np
 from unittest.mock import AsyncMock, MagicMock, patch
-from app.services.cache_service import CacheService
+from app.services.cache_service import CacheService, _quantize_embedding
+
+def _embedding_bytes(embedding):
+    """Encode an embedding the way CacheService stores it (scaled int8)"""
+    return _quantize_embedding(embedding)
 
 @pytest.fixture
 def cache_service():
@@ -15,19 +19,26 @@ def cache_service():
     service.redis_client = AsyncMock()
     return service
 
-@pytest.mark.asyncio
 async def test_embedding_cache_hit(cache_service):
     """Test embedding cache hit"""
     # Mock cache hit
     test_embedding = [0.1, 0.2, 0.3]
-    cache_service.redis_client.get.return_value = json.dumps(test_embedding)
-    
+    cache_service.redis_client.get.return_value = _embedding_bytes(test_embedding)
+
     result = await cache_service.get_embedding_cache("test text", "test-model")
-    
-    assert result == test_embedding
+
+    # int8 quantization is lossy; error is bounded by scale/254
+    assert result == pytest.approx(test_embedding, abs=0.01)
     cache_service.redis_client.get.assert_called_once()
 
-@pytest.mark.asyncio
+async def test_embedding_cache_legacy_json_entry(cache_service):
+    """Legacy JSON-encoded entries read as misses, not garbage floats"""
+    cache_service.redis_client.get.return_value = b"[0.1, 0.2, 0.3]"
+
+    result = await cache_service.get_embedding_cache("test text", "test-model")
+
+    assert result is None
+
 async def test_embedding_cache_miss(cache_service):
     """Test embedding cache miss"""
     # Mock cache miss
@@ -38,7 +49,6 @@ async def test_embedding_cache_miss(cache_service):
     assert result is None
     cache_service.redis_client.get.assert_called_once()
 
-@pytest.mark.asyncio
 async def test_set_embedding_cache(cache_service):
     """Test setting embedding cache"""
     test_embedding = [0.1, 0.2, 0.3]
@@ -49,7 +59,37 @@ async def test_set_embedding_cache(cache_service):
     assert result is True
     cache_service.redis_client.setex.assert_called_once()
 
-@pytest.mark.asyncio
+def _mock_pipeline(cache_service, results):
+    """Wire a mock pipeline supporting `async with` onto the mocked Redis client"""
+    pipe = MagicMock()
+    pipe.__aenter__.return_value = pipe
+    pipe.execute = AsyncMock(return_value=results)
+    cache_service.redis_client.pipeline = MagicMock(return_value=pipe)
+    return pipe
+
+async def test_get_embeddings_cache_batch(cache_service):
+    """Test batched embedding cache lookup uses one pipeline round-trip"""
+    pipe = _mock_pipeline(cache_service, [_embedding_bytes([0.1, 0.2]), None])
+
+    result = await cache_service.get_embeddings_cache_batch(["hit", "miss"], "test-model")
+
+    assert result[0] == pytest.approx([0.1, 0.2], abs=0.01)
+    assert result[1] is None
+    assert pipe.get.call_count == 2
+    pipe.execute.assert_awaited_once()
+
+async def test_set_embeddings_cache_batch(cache_service):
+    """Test batched embedding cache write uses one pipeline round-trip"""
+    pipe = _mock_pipeline(cache_service, [])
+
+    result = await cache_service.set_embeddings_cache_batch(
+        [("text1", [0.1, 0.2]), ("text2", [0.3, 0.4])], "test-model"
+    )
+
+    assert result is True
+    assert pipe.setex.call_count == 2
+    pipe.execute.assert_awaited_once()
+
 async def test_query_cache_hit(cache_service):
     """Test query cache hit"""
     test_result = {"answer": "test answer", "context": "test context"}
@@ -60,7 +100,6 @@ async def test_query_cache_hit(cache_service):
     assert result == test_result
     cache_service.redis_client.get.assert_called_once()
 
-@pytest.mark.asyncio
 async def test_query_cache_miss(cache_service):
     """Test query cache miss"""
     cache_service.redis_client.get.return_value = None
@@ -70,7 +109,6 @@ async def test_query_cache_miss(cache_service):
     assert result is None
     cache_service.redis_client.get.assert_called_once()
 
-@pytest.mark.asyncio
 async def test_set_query_cache(cache_service):
     """Test setting query cache"""
     test_result = {"answer": "test answer", "context": "test context"}
@@ -81,21 +119,37 @@ async def test_set_query_cache(cache_service):
     assert result is True
     cache_service.redis_client.setex.assert_called_once()
 
-@pytest.mark.asyncio
 async def test_similarity_search_cache(cache_service):
     """Test similarity search caching"""
     test_docs = [
         {"page_content": "content 1", "metadata": {"doc_id": "1"}},
         {"page_content": "content 2", "metadata": {"doc_id": "2"}}
     ]
-    cache_service.redis_client.get.return_value = json.dumps(test_docs)
-    
+    # (chunk_key, metadata) entries reference content-addressed chunk
+    # bodies fetched via MGET
+    entries = [
+        ["chunk:abc", {"doc_id": "1"}],
+        ["chunk:def", {"doc_id": "2"}]
+    ]
+    cache_service.redis_client.get.return_value = json.dumps(entries)
+    cache_service.redis_client.mget.return_value = [b"content 1", b"content 2"]
+
     result = await cache_service.get_similarity_search_cache("test question")
-    
+
     assert result == test_docs
     cache_service.redis_client.get.assert_called_once()
+    cache_service.redis_client.mget.assert_called_once_with(["chunk:abc", "chunk:def"])
+
+async def test_similarity_search_cache_stale_chunk(cache_service):
+    """Expired chunk bodies turn the entry into a full miss"""
+    entries = [["chunk:abc", {}]]
+    cache_service.redis_client.get.return_value = json.dumps(entries)
+    cache_service.redis_client.mget.return_value = [None]
+
+    result = await cache_service.get_similarity_search_cache("test question")
+
+    assert result is None
 
-@pytest.mark.asyncio
 async def test_cache_key_generation(cache_service):
     """Test cache key generation is consistent"""
     key1 = cache_service._generate_cache_key("test", "arg1", "arg2", param1="value1")
@@ -106,19 +160,42 @@ async def test_cache_key_generation(cache_service):
     assert key1 != key3  # Different inputs should generate different keys
     assert key1.startswith("test:")  # Should have correct prefix
 
-@pytest.mark.asyncio
 async def test_invalidate_document_cache(cache_service):
     """Test document cache invalidation"""
-    cache_service.redis_client.keys.return_value = ["query:key1", "similarity:key2"]
-    cache_service.redis_client.delete.return_value = 2
-    
+    cache_service.redis_client.smembers.return_value = {b"query:key1", b"similarity:key2"}
+    cache_service.redis_client.unlink.return_value = 3
+
     await cache_service.invalidate_document_cache("test-doc-id")
-    
-    cache_service.redis_client.keys.assert_called()
-    # Should be called twice - once for each pattern
-    assert cache_service.redis_client.delete.call_count == 2
 
-@pytest.mark.asyncio
+    cache_service.redis_client.smembers.assert_called_once_with("doc_index:test-doc-id")
+    # One UNLINK covering both cached keys and the index SET itself
+    cache_service.redis_client.unlink.assert_called_once()
+    deleted = cache_service.redis_client.unlink.call_args.args
+    assert b"query:key1" in deleted
+    assert b"similarity:key2" in deleted
+    assert "doc_index:test-doc-id" in deleted
+
+async def test_parsed_text_cache_roundtrip(cache_service):
+    """Test parsed-text caching keyed by content hash"""
+    cache_service.redis_client.get.return_value = b"extracted text"
+
+    assert await cache_service.get_parsed_text_cache("abc123") == "extracted text"
+    cache_service.redis_client.get.assert_called_once_with("pdf_text:abc123")
+
+    assert await cache_service.set_parsed_text_cache("abc123", "extracted text") is True
+    cache_service.redis_client.setex.assert_called_once()
+
+async def test_delete_pattern(cache_service):
+    """Test pattern deletes run through the server-side SCAN+UNLINK script"""
+    cache_service.redis_client.eval.return_value = 5
+
+    deleted = await cache_service.delete_pattern("embedding:*")
+
+    assert deleted == 5
+    cache_service.redis_client.eval.assert_called_once_with(
+        CacheService.SCAN_DELETE_SCRIPT, 0, "embedding:*"
+    )
+
 async def test_cache_stats(cache_service):
     """Test cache statistics retrieval"""
     mock_info = {
@@ -136,7 +213,6 @@ async def test_cache_stats(cache_service):
     assert stats["used_memory"] == "1.5M"
     assert stats["hit_rate"] == "80.0%"
 
-@pytest.mark.asyncio
 async def test_cache_disabled_graceful_handling():
     """Test that cache operations handle disabled Redis gracefully"""
     service = CacheService()
@@ -148,28 +224,27 @@ async def test_cache_disabled_graceful_handling():
     assert await service.get_query_cache("question") is None
     assert await service.set_query_cache("question", {}) is False
 
-@pytest.mark.asyncio
 async def test_cache_connection():
     """Test Redis connection establishment"""
     service = CacheService()
     
-    with patch('redis.asyncio.from_url') as mock_from_url:
+    with patch('redis.asyncio.ConnectionPool.from_url') as mock_from_url, \
+         patch('redis.asyncio.Redis') as mock_redis_cls:
         mock_redis = AsyncMock()
         mock_redis.ping.return_value = True
-        mock_from_url.return_value = mock_redis
-        
+        mock_redis_cls.return_value = mock_redis
+
         await service.connect()
-        
+
         assert service.redis_client is not None
         mock_from_url.assert_called_once()
         mock_redis.ping.assert_called_once()
 
-@pytest.mark.asyncio
 async def test_cache_connection_failure():
     """Test Redis connection failure handling"""
     service = CacheService()
     
-    with patch('redis.asyncio.from_url') as mock_from_url:
+    with patch('redis.asyncio.ConnectionPool.from_url') as mock_from_url:
         mock_from_url.side_effect = Exception("Connection failed")
         
         await service.connect()
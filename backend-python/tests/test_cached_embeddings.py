@@ -2,7 +2,6 @@
 Tests for cached embeddings wrapper
 """
 import pytest
-import pytest_asyncio
 from unittest.mock import AsyncMock, MagicMock, patch
 from app.utils.cached_embeddings import CachedEmbeddings, create_cached_embeddings
 
@@ -21,9 +20,10 @@ def mock_cache_service():
         # Make the cache service methods async mocks
         mock.get_embedding_cache = AsyncMock()
         mock.set_embedding_cache = AsyncMock()
+        mock.get_embeddings_cache_batch = AsyncMock(side_effect=lambda texts, model: [None] * len(texts))
+        mock.set_embeddings_cache_batch = AsyncMock(return_value=True)
         yield mock
 
-@pytest.mark.asyncio
 async def test_cached_embeddings_cache_hit(mock_base_embeddings, mock_cache_service):
     """Test cached embeddings with cache hit"""
     # Setup cache hit
@@ -37,7 +37,6 @@ async def test_cached_embeddings_cache_hit(mock_base_embeddings, mock_cache_serv
     # Base embeddings should not be called on cache hit
     mock_base_embeddings.embed_query.assert_not_called()
 
-@pytest.mark.asyncio
 async def test_cached_embeddings_cache_miss(mock_base_embeddings, mock_cache_service):
     """Test cached embeddings with cache miss"""
     # Setup cache miss
@@ -52,30 +51,38 @@ async def test_cached_embeddings_cache_miss(mock_base_embeddings, mock_cache_ser
     mock_cache_service.set_embedding_cache.assert_called_once()
     mock_base_embeddings.embed_query.assert_called_once()
 
-@pytest.mark.asyncio
 async def test_cached_embeddings_documents_partial_cache(mock_base_embeddings, mock_cache_service):
     """Test cached embeddings for documents with partial cache hit"""
     # Setup partial cache hit - first text cached, second not
-    def cache_side_effect(text, model):
-        if text == "cached text":
-            return [0.9, 1.0]
-        return None
-    
-    mock_cache_service.get_embedding_cache.side_effect = cache_side_effect
-    mock_cache_service.set_embedding_cache.return_value = True
-    
+    mock_cache_service.get_embeddings_cache_batch.side_effect = None
+    mock_cache_service.get_embeddings_cache_batch.return_value = [[0.9, 1.0], None]
+
     cached_embeddings = CachedEmbeddings(mock_base_embeddings, "test-model")
     result = await cached_embeddings.aembed_documents(["cached text", "new text"])
-    
+
     # Should return cached result for first text, computed result for second
     assert len(result) == 2
     assert result[0] == [0.9, 1.0]  # Cached
     assert result[1] == [0.1, 0.2]  # From base embeddings (first in mock return)
-    
+
     # Should only compute embeddings for uncached text
     mock_base_embeddings.embed_documents.assert_called_once_with(["new text"])
+    mock_cache_service.set_embeddings_cache_batch.assert_called_once_with(
+        [("new text", [0.1, 0.2])], "test-model"
+    )
+
+async def test_cached_embeddings_documents_deduplicates_batch(mock_base_embeddings, mock_cache_service):
+    """Duplicate texts in one batch are embedded once and fanned back out"""
+    cached_embeddings = CachedEmbeddings(mock_base_embeddings, "test-model")
+    result = await cached_embeddings.aembed_documents(["same text", "other text", "same text"])
+
+    assert result == [[0.1, 0.2], [0.3, 0.4], [0.1, 0.2]]
+    # Underlying embedder only sees the distinct texts
+    mock_base_embeddings.embed_documents.assert_called_once_with(["same text", "other text"])
+    mock_cache_service.set_embeddings_cache_batch.assert_called_once_with(
+        [("same text", [0.1, 0.2]), ("other text", [0.3, 0.4])], "test-model"
+    )
 
-@pytest.mark.asyncio
 async def test_cached_embeddings_sync_fallback(mock_base_embeddings, mock_cache_service):
     """Test that sync methods work without caching"""
     cached_embeddings = CachedEmbeddings(mock_base_embeddings, "test-model")
@@ -93,7 +100,6 @@ async def test_cached_embeddings_sync_fallback(mock_base_embeddings, mock_cache_
     # Cache should not be used for sync methods
     mock_cache_service.get_embedding_cache.assert_not_called()
 
-@pytest.mark.asyncio
 async def test_cached_embeddings_async_base_embeddings(mock_cache_service):
     """Test with async base embeddings"""
     # Create async base embeddings
@@ -117,6 +123,50 @@ async def test_cached_embeddings_async_base_embeddings(mock_cache_service):
     assert result == [[0.1, 0.2]]
     async_embeddings.aembed_documents.assert_called_once_with(["text1"])
 
+async def test_cached_embeddings_query_single_flight(mock_cache_service):
+    """Concurrent identical queries share one embedding call and cache write"""
+    import asyncio
+
+    calls = 0
+
+    async def slow_embed(text):
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return [0.5, 0.6]
+
+    async_embeddings = MagicMock()
+    async_embeddings.aembed_query = AsyncMock(side_effect=slow_embed)
+
+    mock_cache_service.get_embedding_cache.return_value = None
+    mock_cache_service.set_embedding_cache.return_value = True
+
+    cached_embeddings = CachedEmbeddings(async_embeddings, "test-model")
+    results = await asyncio.gather(
+        *[cached_embeddings.aembed_query("same query") for _ in range(5)]
+    )
+
+    assert results == [[0.5, 0.6]] * 5
+    assert calls == 1
+    mock_cache_service.set_embedding_cache.assert_called_once()
+
+async def test_cached_embeddings_local_lru_bound(mock_base_embeddings, mock_cache_service):
+    """The in-process front cache serves repeats and evicts past its bound"""
+    mock_cache_service.get_embedding_cache.return_value = None
+    mock_cache_service.set_embedding_cache.return_value = True
+
+    cached_embeddings = CachedEmbeddings(mock_base_embeddings, "test-model")
+    cached_embeddings._local_maxsize = 2
+
+    await cached_embeddings.aembed_query("query 0")
+    # A repeat is served from the local LRU — no second Redis lookup
+    await cached_embeddings.aembed_query("query 0")
+    assert mock_cache_service.get_embedding_cache.call_count == 1
+
+    await cached_embeddings.aembed_query("query 1")
+    await cached_embeddings.aembed_query("query 2")
+    assert len(cached_embeddings._local) == 2
+
 def test_create_cached_embeddings_factory(mock_base_embeddings):
     """Test the factory function"""
     result = create_cached_embeddings(mock_base_embeddings, "test-model")
@@ -125,7 +175,6 @@ def test_create_cached_embeddings_factory(mock_base_embeddings):
     assert result.embeddings == mock_base_embeddings
     assert result.model_name == "test-model"
 
-@pytest.mark.asyncio
 async def test_cached_embeddings_error_handling(mock_base_embeddings, mock_cache_service):
     """Test error handling in cached embeddings"""
     # Setup cache service to raise exception
@@ -138,7 +187,56 @@ async def test_cached_embeddings_error_handling(mock_base_embeddings, mock_cache
     assert result == [0.5, 0.6]  # From base embeddings
     mock_base_embeddings.embed_query.assert_called_once()
 
-@pytest.mark.asyncio
+async def test_cached_embeddings_all_cached_skips_base(mock_base_embeddings, mock_cache_service):
+    """A fully cached batch never touches the underlying embedder"""
+    mock_cache_service.get_embeddings_cache_batch.side_effect = None
+    mock_cache_service.get_embeddings_cache_batch.return_value = [[0.1, 0.2], [0.3, 0.4]]
+
+    cached_embeddings = CachedEmbeddings(mock_base_embeddings, "test-model")
+    result = await cached_embeddings.aembed_documents(["text1", "text2"])
+
+    assert result == [[0.1, 0.2], [0.3, 0.4]]
+    mock_base_embeddings.embed_documents.assert_not_called()
+    mock_cache_service.set_embeddings_cache_batch.assert_not_called()
+
+async def test_cached_embeddings_whitespace_query_skips_cache(mock_base_embeddings, mock_cache_service):
+    """Whitespace-only queries never hit Redis (guaranteed misses)"""
+    cached_embeddings = CachedEmbeddings(mock_base_embeddings, "test-model")
+    result = await cached_embeddings.aembed_query("   ")
+
+    assert result == [0.5, 0.6]
+    mock_cache_service.get_embedding_cache.assert_not_called()
+    mock_cache_service.set_embedding_cache.assert_not_called()
+
+async def test_cached_embeddings_no_gather_on_single_query(mock_base_embeddings, mock_cache_service):
+    """A single query is plain awaits - no Task fan-out overhead"""
+    mock_cache_service.get_embedding_cache.return_value = None
+    mock_cache_service.set_embedding_cache.return_value = True
+
+    cached_embeddings = CachedEmbeddings(mock_base_embeddings, "test-model")
+    with patch("asyncio.gather") as mock_gather:
+        result = await cached_embeddings.aembed_query("test query")
+
+    assert result == [0.5, 0.6]
+    mock_gather.assert_not_called()
+
+async def test_cached_embeddings_metrics_increment(mock_base_embeddings, mock_cache_service):
+    """Hit/miss counters track cache outcomes"""
+    from app.utils.cached_embeddings import get_embed_cache_stats
+
+    mock_cache_service.get_embedding_cache.return_value = None
+    mock_cache_service.set_embedding_cache.return_value = True
+
+    cached_embeddings = CachedEmbeddings(mock_base_embeddings, "test-model")
+    before = get_embed_cache_stats()
+
+    await cached_embeddings.aembed_query("fresh query")      # miss
+    await cached_embeddings.aembed_query("fresh query")      # local LRU hit
+
+    after = get_embed_cache_stats()
+    assert after["misses"] == before["misses"] + 1
+    assert after["hits"] == before["hits"] + 1
+
 async def test_cached_embeddings_empty_documents(mock_base_embeddings, mock_cache_service):
     """Test cached embeddings with empty document list"""
     cached_embeddings = CachedEmbeddings(mock_base_embeddings, "test-model")
@@ -1,10 +1,8 @@
 import pytest
-import pytest_asyncio
 from unittest.mock import patch, MagicMock, AsyncMock, mock_open
 from app.services.ingest_service import ingest_document
 
 
-@pytest.mark.asyncio
 async def test_ingest_text_document(mock_async_session, mock_pgvector, mock_embeddings, mock_text_splitter, mock_uploadfile):
     """Test ingesting a text document"""
     # Create a mock file
@@ -30,7 +28,6 @@ async def test_ingest_text_document(mock_async_session, mock_pgvector, mock_embe
             assert result["chunks"] == 2
 
 
-@pytest.mark.asyncio
 async def test_ingest_pdf_document(mock_async_session, mock_pgvector, mock_embeddings, mock_text_splitter, mock_pdf_reader, mock_uploadfile):
     """Test ingesting a PDF document"""
     # Create a mock PDF file
@@ -55,7 +52,6 @@ async def test_ingest_pdf_document(mock_async_session, mock_pgvector, mock_embed
             assert result["chunks"] == 2
 
 
-@pytest.mark.asyncio
 async def test_ingest_unsupported_file_type(mock_uploadfile):
     """Test ingesting an unsupported file type"""
     # Create a mock file with unsupported extension
@@ -72,7 +68,6 @@ async def test_ingest_unsupported_file_type(mock_uploadfile):
         assert "Unsupported file type" in result["message"]
 
 
-@pytest.mark.asyncio
 async def test_ingest_document_with_chunks(mock_async_session, mock_pgvector, mock_embeddings, mock_text_splitter, mock_uploadfile):
     """Test that document is properly chunked"""
     # Create a mock file
@@ -102,7 +97,6 @@ async def test_ingest_document_with_chunks(mock_async_session, mock_pgvector, mo
             assert result["chunks"] == 3
 
 
-@pytest.mark.asyncio
 async def test_ingest_document_stores_metadata(mock_async_session, mock_pgvector, mock_embeddings, mock_text_splitter, mock_uploadfile):
     """Test that document metadata is properly stored"""
     # Create a mock file
@@ -133,7 +127,6 @@ async def test_ingest_document_stores_metadata(mock_async_session, mock_pgvector
             assert all(metadata["document_id"] == "metadata-test-uuid" for metadata in metadatas)
 
 
-@pytest.mark.asyncio
 async def test_ingest_document_validation(mock_uploadfile):
     """Test document validation during ingestion"""
     # Test with empty filename
@@ -1,10 +1,8 @@
 import pytest
-import pytest_asyncio
 from unittest.mock import patch, MagicMock
 from app.services.query_service import query_documents
 
 
-@pytest.mark.asyncio
 async def test_query_documents_success(mock_pgvector, mock_embeddings, mock_huggingface_pipeline):
     """Test successful document querying"""
     query_payload = {
@@ -19,7 +17,6 @@ async def test_query_documents_success(mock_pgvector, mock_embeddings, mock_hugg
     assert result["answer"] == "Test answer from HuggingFace"
 
 
-@pytest.mark.asyncio
 async def test_query_documents_with_doc_id(mock_pgvector, mock_embeddings, mock_huggingface_pipeline):
     """Test querying with specific document ID"""
     query_payload = {
@@ -39,7 +36,6 @@ async def test_query_documents_with_doc_id(mock_pgvector, mock_embeddings, mock_
     assert "context" in result
 
 
-@pytest.mark.asyncio
 async def test_query_documents_no_question():
     """Test query with no question provided"""
     query_payload = {}
@@ -50,7 +46,6 @@ async def test_query_documents_no_question():
     assert result["error"] == "No question provided."
 
 
-@pytest.mark.asyncio
 async def test_query_documents_empty_question():
     """Test query with empty question"""
     query_payload = {"question": ""}
@@ -61,7 +56,6 @@ async def test_query_documents_empty_question():
     assert result["error"] == "No question provided."
 
 
-@pytest.mark.asyncio
 async def test_query_documents_context_generation(mock_pgvector, mock_embeddings, mock_huggingface_pipeline):
     """Test that context is properly generated from search results"""
     # Configure mock to return specific content
@@ -81,7 +75,6 @@ async def test_query_documents_context_generation(mock_pgvector, mock_embeddings
     assert result["context"] == "First chunk of content\nSecond chunk of content"
 
 
-@pytest.mark.asyncio
 async def test_query_documents_context_truncation(mock_pgvector, mock_embeddings, mock_huggingface_pipeline):
     """Test that long context is properly truncated"""
     # Create a very long piece of content
@@ -102,7 +95,6 @@ async def test_query_documents_context_truncation(mock_pgvector, mock_embeddings
     assert len(context_words) <= 200
 
 
-@pytest.mark.asyncio
 async def test_query_documents_llm_interaction(mock_pgvector, mock_embeddings, mock_huggingface_pipeline):
     """Test that LLM is properly called with formatted prompt"""
     query_payload = {
@@ -116,7 +108,6 @@ async def test_query_documents_llm_interaction(mock_pgvector, mock_embeddings, m
     mock_huggingface_pipeline["instance"].assert_called_once()
 
 
-@pytest.mark.asyncio
 async def test_query_documents_environment_variable_check():
     """Test behavior when PGVECTOR_CONN is not set"""
     with patch.dict('os.environ', {}, clear=True):
@@ -130,7 +121,6 @@ async def test_query_documents_environment_variable_check():
         assert result["error"] == "PGVECTOR_CONN environment variable not set."
 
 
-@pytest.mark.asyncio
 async def test_query_documents_multiple_filters(mock_pgvector, mock_embeddings, mock_huggingface_pipeline):
     """Test querying with document ID creates proper filter"""
     query_payload = {
@@ -145,7 +135,6 @@ async def test_query_documents_multiple_filters(mock_pgvector, mock_embeddings,
     assert call_args[1]["metadata"]["document_id"] == "specific-doc-uuid"
 
 
-@pytest.mark.asyncio
 async def test_query_documents_empty_search_results(mock_pgvector, mock_embeddings, mock_huggingface_pipeline):
     """Test behavior when no documents are found"""
     # Configure mock to return empty results
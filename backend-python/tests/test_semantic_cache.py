@@ -0,0 +1,55 @@
+"""
+Tests for the in-memory semantic cache
+"""
+import pytest
+from app.services.semantic_cache import SemanticCache
+
+def test_semantic_cache_hit_on_similar_embedding():
+    """Near-identical embeddings reuse the cached response"""
+    cache = SemanticCache(threshold=0.85, maxsize=4, ttl=300)
+    cache.add([1.0, 0.0, 0.0], {"answer": "cached"})
+
+    assert cache.get([0.99, 0.05, 0.0]) == {"answer": "cached"}
+
+def test_semantic_cache_miss_below_threshold():
+    """Dissimilar embeddings fall through"""
+    cache = SemanticCache(threshold=0.85, maxsize=4, ttl=300)
+    cache.add([1.0, 0.0, 0.0], {"answer": "cached"})
+
+    assert cache.get([0.0, 1.0, 0.0]) is None
+
+def test_semantic_cache_scope_isolation():
+    """An entry cached for one doc scope never answers another"""
+    cache = SemanticCache(threshold=0.85, maxsize=4, ttl=300)
+    cache.add([1.0, 0.0, 0.0], {"answer": "doc-a"}, scope=("doc-a", 10))
+
+    assert cache.get([1.0, 0.0, 0.0], scope=("doc-b", 10)) is None
+    assert cache.get([1.0, 0.0, 0.0], scope=(None, 10)) is None
+    assert cache.get([1.0, 0.0, 0.0], scope=("doc-a", 10)) == {"answer": "doc-a"}
+
+def test_semantic_cache_lru_eviction():
+    """Entries past maxsize are evicted from the cold end"""
+    cache = SemanticCache(threshold=0.99, maxsize=2, ttl=300)
+    cache.add([1.0, 0.0, 0.0], "a")
+    cache.add([0.0, 1.0, 0.0], "b")
+    cache.add([0.0, 0.0, 1.0], "c")
+
+    assert cache.get([1.0, 0.0, 0.0]) is None
+    assert cache.get([0.0, 1.0, 0.0]) == "b"
+    assert cache.get([0.0, 0.0, 1.0]) == "c"
+
+def test_semantic_cache_ttl_expiry(monkeypatch):
+    """Expired entries are not served"""
+    import app.services.semantic_cache as sc
+
+    now = [0.0]
+    monkeypatch.setattr(sc.time, "monotonic", lambda: now[0])
+
+    cache = SemanticCache(threshold=0.85, maxsize=4, ttl=10)
+    cache.add([1.0, 0.0, 0.0], "a")
+
+    now[0] = 5.0
+    assert cache.get([1.0, 0.0, 0.0]) == "a"
+
+    now[0] = 20.0
+    assert cache.get([1.0, 0.0, 0.0]) is None